@@ -0,0 +1,52 @@
+"""Build time of materialized upcoming birthdays in Redis
+
+Run from project root: python -m benchmarks.birthdays_materialize [db_url] [contacts] [redis_url]
+Uses fakeredis when redis_url is not given.
+"""
+import asyncio
+import sys
+import time
+from datetime import date
+
+import fakeredis
+from redis.asyncio import Redis
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.repository.contacts import ContactRepository
+from src.schemas import TokenClaims
+from src.services.birthdays import build_birthdays
+
+CONTACTS = 1000000
+USERS = 1000
+
+async def main(db_url: str, contacts: int, redis_url: str | None):
+    engine = await seed_contacts(db_url, contacts // USERS, users=USERS)
+    Session = session_factory(engine)
+    redis = Redis.from_url(redis_url) if redis_url else fakeredis.FakeAsyncRedis()
+    today = date.today()
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+    async with Session() as session:
+        started = time.perf_counter()
+        materialized = await build_birthdays(redis, session, today)
+        print(
+            f"contacts={contacts} users={USERS} materialized={materialized} "
+            f"build {time.perf_counter() - started:.2f} s"
+        )
+        sql = ContactRepository(session)
+        cached = ContactRepository(session, redis)
+        for days in (7, 30):
+            print(
+                f"days={days:<2} sql {await timed(lambda: sql.birthdays_contacts(0, 100, user, days=days))}  "
+                f"materialized {await timed(lambda: cached.birthdays_contacts(0, 100, user, days=days))}"
+            )
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL,
+            int(sys.argv[2]) if len(sys.argv) > 2 else CONTACTS,
+            sys.argv[3] if len(sys.argv) > 3 else None,
+        )
+    )
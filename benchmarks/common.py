@@ -0,0 +1,87 @@
+"""Shared helpers for database benchmarks"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from src.database.models import Base, Contact, User
+
+DEFAULT_DB_URL = "sqlite+aiosqlite:///./var/benchmark.db"
+BATCH_SIZE = 10000
+
+async def seed_contacts(db_url: str, contacts: int, users: int = 1) -> AsyncEngine:
+    """Recreate schema and insert contacts spread over users
+
+    Args:
+        db_url (str): Database URL
+        contacts (int): Number of contacts per user
+        users (int, optional): Number of users. Defaults to 1.
+
+    Returns:
+        AsyncEngine
+    """
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "confirmed": True}
+                for i in range(1, users + 1)
+            ],
+        )
+
+    rnd = random.Random(42)
+    now = datetime.now()
+    rows = []
+    async with engine.begin() as conn:
+        for user_id in range(1, users + 1):
+            for i in range(contacts):
+                rows.append(
+                    {
+                        "firstname": f"First{rnd.randrange(100000)}",
+                        "lastname": f"Last{rnd.randrange(100000)}",
+                        "email": f"contact{user_id}_{i}@example.com",
+                        "phone": f"38067{rnd.randrange(10**7):07d}",
+                        "birthday": datetime(1950, 1, 1) + timedelta(days=rnd.randrange(365 * 60)),
+                        "description": "Benchmark contact",
+                        "done": rnd.random() < 0.5,
+                        "created_at": now,
+                        "updated_at": now - timedelta(seconds=rnd.randrange(10**7)),
+                        "user_id": user_id,
+                    }
+                )
+                if len(rows) >= BATCH_SIZE:
+                    await conn.execute(insert(Contact), rows)
+                    rows = []
+        if rows:
+            await conn.execute(insert(Contact), rows)
+    return engine
+
+def session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+async def timed(fn, repeat: int = 20) -> dict:
+    """Run coroutine function repeatedly and report latency in ms
+
+    Args:
+        fn: Coroutine function without arguments
+        repeat (int, optional): Number of runs. Defaults to 20.
+
+    Returns:
+        Dict with p50, p99 and mean latency
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+    }
@@ -0,0 +1,41 @@
+"""Upcoming birthdays latency over indexed birthday month/day
+
+Run from project root: python -m benchmarks.contacts_birthdays [db_url] [contacts]
+"""
+import asyncio
+import sys
+from datetime import date
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.repository.contacts import ContactRepository
+from src.schemas import TokenClaims
+
+CONTACTS = 1000000
+WINDOWS = {
+    "7 days": (date(2025, 6, 10), 7),
+    "30 days": (date(2025, 6, 10), 30),
+    "new year": (date(2025, 12, 28), 7),
+    "leap day": (date(2025, 2, 25), 7),
+}
+
+async def main(db_url: str, contacts: int):
+    engine = await seed_contacts(db_url, contacts)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+    async with Session() as session:
+        repository = ContactRepository(session)
+        for name, (today, days) in WINDOWS.items():
+            found = await repository.birthdays_contacts(0, 100, user, days=days, today=today)
+            latency = await timed(
+                lambda: repository.birthdays_contacts(0, 100, user, days=days, today=today)
+            )
+            print(f"contacts={contacts} window={name:<9} page of {len(found)} {latency}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL,
+            int(sys.argv[2]) if len(sys.argv) > 2 else CONTACTS,
+        )
+    )
@@ -0,0 +1,52 @@
+"""Rows per second of single and bulk contact creation
+
+Run from project root: python -m benchmarks.contacts_bulk_create [db_url]
+"""
+import asyncio
+import sys
+import time
+from datetime import date
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactModel, TokenClaims
+
+ROWS = 5000
+BATCH = 1000
+
+def bodies(prefix: str, count: int) -> list[ContactModel]:
+    return [
+        ContactModel(
+            firstname=f"{prefix}{i}",
+            lastname="Benchmark",
+            email=f"{prefix.lower()}{i}@example.com",
+            phone="380671234567",
+            birthday=date(1990, 1, 1),
+            description="Benchmark contact",
+        )
+        for i in range(count)
+    ]
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, 0)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+    async with Session() as session:
+        repository = ContactRepository(session)
+        started = time.perf_counter()
+        for body in bodies("Single", ROWS):
+            await repository.create_contact(body, user)
+        single = ROWS / (time.perf_counter() - started)
+
+        items = bodies("Bulk", ROWS)
+        started = time.perf_counter()
+        for start in range(0, ROWS, BATCH):
+            await repository.create_contacts(items[start : start + BATCH], user)
+        bulk = ROWS / (time.perf_counter() - started)
+
+    print(f"rows={ROWS} single {single:.0f} rows/s  bulk of {BATCH} {bulk:.0f} rows/s  x{bulk / single:.1f}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
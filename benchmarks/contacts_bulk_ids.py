@@ -0,0 +1,43 @@
+"""Latency of bulk patch by id set: one UPDATE vs one UPDATE per id
+
+Run from project root: python -m benchmarks.contacts_bulk_ids [db_url]
+"""
+import asyncio
+import itertools
+import sys
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactPatch, ContactStatusUpdate, TokenClaims
+
+CONTACTS = 100000
+IDS = 5000
+REPEAT = 5
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+    ids = list(range(1, CONTACTS, CONTACTS // IDS))[:IDS]
+
+    async with Session() as session:
+        repository = ContactRepository(session)
+        # Alternate value so every call writes
+        flips = itertools.cycle((True, False))
+
+        async def per_id():
+            done = next(flips)
+            for contact_id in ids:
+                await repository.update_status_contact(contact_id, ContactStatusUpdate(done=done), user)
+
+        async def bulk():
+            await repository.update_contacts(ids, ContactPatch(done=next(flips)), user)
+
+        print(f"get_contacts_by_ids {len(ids)} ids  {await timed(lambda: repository.get_contacts_by_ids(ids, user), REPEAT)}")
+        print(f"patch per id        {len(ids)} ids  {await timed(per_id, REPEAT)}")
+        print(f"patch bulk          {len(ids)} ids  {await timed(bulk, REPEAT)}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
@@ -0,0 +1,74 @@
+"""Bandwidth and DB load of replayed contact polling with and without If-None-Match
+
+Clients poll the first page of contacts and one contact, one write lands
+every WRITE_EVERY polls.
+
+Run from project root: python -m benchmarks.contacts_conditional_polling [db_url]
+"""
+import asyncio
+import sys
+
+import fakeredis
+import httpx
+from sqlalchemy import event
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory
+from main import app
+from src.database.db import get_db
+from src.redis.redis import get_redis
+from src.schemas import TokenClaims
+from src.services.auth import get_current_claims
+
+CONTACTS = 10000
+POLLS = 2000
+WRITE_EVERY = 50
+URLS = ("/api/contacts/?limit=100", "/api/contacts/42")
+
+async def replay(client: httpx.AsyncClient, conditional: bool, statements: list) -> dict:
+    etags = {}
+    sent = 0
+    statements[0] = 0
+    not_modified = 0
+    for poll in range(POLLS):
+        if poll % WRITE_EVERY == WRITE_EVERY - 1:
+            await client.patch("/api/contacts/42", json={"done": poll % 2 == 0})
+        url = URLS[poll % len(URLS)]
+        headers = {"If-None-Match": etags[url]} if conditional and url in etags else {}
+        response = await client.get(url, headers=headers)
+        sent += len(response.content)
+        not_modified += response.status_code == 304
+        if "etag" in response.headers:
+            etags[url] = response.headers["etag"]
+    return {"bytes": sent, "statements": statements[0], "not_modified": not_modified}
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS)
+    Session = session_factory(engine)
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    async def override_get_db():
+        async with Session() as session:
+            yield session
+
+    redis = fakeredis.FakeAsyncRedis()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_redis] = lambda: redis
+    app.dependency_overrides[get_current_claims] = lambda: TokenClaims(
+        id=1, username="user1", role="USER", token_version=0
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for conditional in (False, True):
+            name = "If-None-Match" if conditional else "plain"
+            print(f"{name:<14} {POLLS} polls  {await replay(client, conditional, statements)}")
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
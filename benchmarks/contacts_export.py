@@ -0,0 +1,49 @@
+"""Resident memory while exporting a large address book
+
+Run from project root: python -m benchmarks.contacts_export [db_url] [contacts]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory
+from src.schemas import TokenClaims
+from src.services.export import ExportFormat, export_contacts
+
+CONTACTS = 1000000
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def main(db_url: str, contacts: int):
+    engine = await seed_contacts(db_url, contacts)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+    for export_format in ExportFormat:
+        samples = []
+        exported = 0
+        started = time.perf_counter()
+        async for chunk in export_contacts(Session, user, export_format):
+            exported += len(chunk)
+            samples.append(rss_mb())
+        elapsed = time.perf_counter() - started
+        # Skip warm-up chunks while driver buffers and caches settle
+        steady = samples[len(samples) // 10 :]
+        print(
+            f"format={export_format.value:<6} rows={contacts} {exported / 2**20:.0f} MiB in {elapsed:.1f} s  "
+            f"RSS start {samples[0]:.0f} MiB, steady min {min(steady):.0f} / max {max(steady):.0f} MiB"
+        )
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL,
+            int(sys.argv[2]) if len(sys.argv) > 2 else CONTACTS,
+        )
+    )
@@ -0,0 +1,75 @@
+"""Lost updates of concurrent read-modify-write contact updates with and without version check
+
+Every writer increments a counter kept in description of one contact.
+Checked writers retry after a version conflict.
+
+Run from project root: python -m benchmarks.contacts_optimistic_updates [db_url]
+"""
+import asyncio
+import sys
+import time
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactUpdate, TokenClaims
+
+CONTACTS = 1000
+WRITERS = 20
+INCREMENTS = 25
+CONTACT_ID = 42
+
+def counter_update(contact, counter: int) -> ContactUpdate:
+    return ContactUpdate(
+        firstname=contact.firstname,
+        lastname=contact.lastname,
+        email=contact.email,
+        phone=contact.phone,
+        birthday=contact.birthday,
+        description=str(counter),
+        done=contact.done,
+    )
+
+async def writer(Session, user, checked: bool, conflicts: list) -> None:
+    async with Session() as session:
+        repository = ContactRepository(session)
+        for _ in range(INCREMENTS):
+            while True:
+                # Benchmark sessions keep objects after commit, reload current row
+                session.expire_all()
+                contact = await repository.get_contact_by_id(CONTACT_ID, user)
+                await session.commit()
+                # Let other writers interleave between read and write
+                await asyncio.sleep(0)
+                body = counter_update(contact, int(contact.description) + 1)
+                versions = [contact.version] if checked else None
+                if await repository.update_contact(CONTACT_ID, body, user, versions):
+                    break
+                conflicts[0] += 1
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+    for checked in (False, True):
+        async with Session() as session:
+            repository = ContactRepository(session)
+            contact = await repository.get_contact_by_id(CONTACT_ID, user)
+            await repository.update_contact(CONTACT_ID, counter_update(contact, 0), user)
+        conflicts = [0]
+        started = time.perf_counter()
+        await asyncio.gather(*(writer(Session, user, checked, conflicts) for _ in range(WRITERS)))
+        elapsed = time.perf_counter() - started
+        async with Session() as session:
+            counter = int((await ContactRepository(session).get_contact_by_id(CONTACT_ID, user)).description)
+        expected = WRITERS * INCREMENTS
+        name = "If-Match" if checked else "unchecked"
+        print(
+            f"{name:<10} increments {expected}  counter {counter}  lost {expected - counter}  "
+            f"conflicts {conflicts[0]}  {elapsed * 1000:.0f} ms"
+        )
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
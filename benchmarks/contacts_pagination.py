@@ -0,0 +1,41 @@
+"""Page 1000 latency of offset and keyset pagination of contacts
+
+Run from project root: python -m benchmarks.contacts_pagination [db_url]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactOrder, TokenClaims
+from src.services.pagination import decode_cursor, encode_cursor
+
+CONTACTS = 200000
+PAGE_SIZE = 100
+PAGE = 1000
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS, users=2)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+    for order_by in ContactOrder:
+        async with Session() as session:
+            repository = ContactRepository(session)
+            skip = (PAGE - 1) * PAGE_SIZE
+            previous = await repository.get_contacts(skip - 1, 1, user, order_by=order_by)
+            after = decode_cursor(encode_cursor(order_by, previous[0]), order_by)
+
+            offset = await timed(lambda: repository.get_contacts(skip, PAGE_SIZE, user, order_by=order_by))
+            keyset = await timed(
+                lambda: repository.get_contacts(0, PAGE_SIZE, user, after=after, order_by=order_by)
+            )
+            same = [c.id for c in await repository.get_contacts(skip, PAGE_SIZE, user, order_by=order_by)] == [
+                c.id for c in await repository.get_contacts(0, PAGE_SIZE, user, after=after, order_by=order_by)
+            ]
+            print(f"order_by={order_by.value:<11} offset {offset}  keyset {keyset}  same rows: {same}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
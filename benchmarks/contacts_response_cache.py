@@ -0,0 +1,84 @@
+"""Latency and DB load of contact reads with and without the response cache
+
+Replays list, search and birthdays reads with one write every READS_PER_WRITE reads.
+
+Run from project root: python -m benchmarks.contacts_response_cache [db_url]
+"""
+import asyncio
+import sys
+import time
+
+import fakeredis
+import httpx
+from sqlalchemy import event
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory
+from main import app
+from src.database.db import get_db
+from src.redis.redis import get_redis
+from src.schemas import TokenClaims
+from src.services.auth import get_current_claims
+from src.services.response_cache import contact_responses
+
+CONTACTS = 100000
+REQUESTS = 2000
+READS_PER_WRITE = 50
+URLS = (
+    "/api/contacts/?limit=100",
+    "/api/contacts/?limit=100&order_by=lastname",
+    "/api/contacts/search/lastname?query=Last12&limit=100",
+    "/api/contacts/birthdays/?days=7&limit=100",
+)
+
+async def replay(client: httpx.AsyncClient, statements: list) -> dict:
+    statements[0] = 0
+    samples = []
+    for request in range(REQUESTS):
+        if request % READS_PER_WRITE == READS_PER_WRITE - 1:
+            await client.patch("/api/contacts/42", json={"done": request % 2 == 0})
+        started = time.perf_counter()
+        response = await client.get(URLS[request % len(URLS)])
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    samples.sort()
+    return {
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99)], 3),
+        "statements": statements[0],
+    }
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS)
+    Session = session_factory(engine)
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    async def override_get_db():
+        async with Session() as session:
+            yield session
+
+    redis = fakeredis.FakeAsyncRedis()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_redis] = lambda: redis
+    app.dependency_overrides[get_current_claims] = lambda: TokenClaims(
+        id=1, username="user1", role="USER", token_version=0
+    )
+    ttl = contact_responses.ttl
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for enabled in (False, True):
+            contact_responses.ttl = ttl if enabled else 0
+            result = await replay(client, statements)
+            name = "cached" if enabled else "uncached"
+            print(f"{name:<9} {REQUESTS} requests  {result}")
+        print(f"cache stats {contact_responses.stats()}")
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
@@ -0,0 +1,54 @@
+"""Substring search latency with LIKE scan and indexed trigram search
+
+Run from project root: python -m benchmarks.contacts_search [db_url] [contacts]
+"""
+import asyncio
+import sys
+
+from sqlalchemy import or_, select
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.database.models import Contact
+from src.repository.contacts import SEARCH_FIELDS, ContactRepository
+from src.schemas import TokenClaims
+
+SIZES = (10000, 1000000)
+QUERIES = {"lastname": "t4242", "email": "1_99999@", "all": "irst123"}
+LIMIT = 100
+
+async def like_search(session, user, search_field, query):
+    fields = SEARCH_FIELDS if search_field == "all" else (search_field,)
+    stmt = (
+        select(Contact)
+        .filter_by(user_id=user.id)
+        .where(or_(*(getattr(Contact, field).ilike(f"%{query}%") for field in fields)))
+        .order_by(Contact.id)
+        .limit(LIMIT)
+    )
+    return (await session.execute(stmt)).scalars().all()
+
+async def main(db_url: str, sizes):
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+    for size in sizes:
+        engine = await seed_contacts(db_url, size)
+        Session = session_factory(engine)
+        async with Session() as session:
+            repository = ContactRepository(session)
+            for search_field, query in QUERIES.items():
+                like = await timed(lambda: like_search(session, user, search_field, query), repeat=10)
+                indexed = await timed(
+                    lambda: repository.search_contacts(search_field, query, 0, LIMIT, user), repeat=10
+                )
+                same = [c.id for c in await like_search(session, user, search_field, query)] == [
+                    c.id for c in await repository.search_contacts(search_field, query, 0, LIMIT, user)
+                ]
+                print(f"contacts={size:<8} {search_field:<9} like {like}  indexed {indexed}  same rows: {same}")
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL,
+            [int(sys.argv[2])] if len(sys.argv) > 2 else SIZES,
+        )
+    )
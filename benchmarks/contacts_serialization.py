@@ -0,0 +1,64 @@
+"""Rows per second of List[ContactResponse] serialization: response_model path vs contacts_json
+
+Run from project root: python -m benchmarks.contacts_serialization
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from src.database.models import Contact
+from src.schemas import ContactResponse
+from src.services.serialization import contacts_json
+
+ROWS = 1000
+REPEAT = 50
+
+def make_contacts() -> list[Contact]:
+    rnd = random.Random(42)
+    now = datetime.now()
+    return [
+        Contact(
+            id=i,
+            firstname=f"First{rnd.randrange(100000)}",
+            lastname=f"Last{rnd.randrange(100000)}",
+            email=f"contact{i}@example.com",
+            phone=f"38067{rnd.randrange(10**7):07d}",
+            birthday=datetime(1950, 1, 1) + timedelta(days=rnd.randrange(365 * 60)),
+            description="Benchmark contact",
+            done=rnd.random() < 0.5,
+            version=1,
+            created_at=now,
+            updated_at=now - timedelta(seconds=rnd.randrange(10**7)),
+        )
+        for i in range(1, ROWS + 1)
+    ]
+
+field = create_model_field("Response", List[ContactResponse], mode="serialization")
+
+def response_model(contacts) -> bytes:
+    # Same steps as FastAPI serialize_response and JSONResponse.render
+    value, _ = field.validate(contacts, {}, loc=("response",))
+    return JSONResponse(jsonable_encoder(field.serialize(value, by_alias=True))).body
+
+def rows_per_second(fn, contacts) -> float:
+    fn(contacts)
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(contacts)
+    return ROWS * REPEAT / (time.perf_counter() - started)
+
+def main():
+    contacts = make_contacts()
+    assert response_model(contacts) == contacts_json(contacts)
+    baseline = rows_per_second(response_model, contacts)
+    fast = rows_per_second(contacts_json, contacts)
+    print(f"response_model  {baseline:>10.0f} rows/s")
+    print(f"contacts_json   {fast:>10.0f} rows/s  x{fast / baseline:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Latency and payload of 1000-row contact pages: ORM entities vs column rows vs sparse fieldset
+
+Run from project root: python -m benchmarks.contacts_sparse_fields [db_url]
+"""
+import asyncio
+import sys
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.repository.contacts import ContactRepository
+from src.schemas import TokenClaims
+from src.services.serialization import CONTACT_RESPONSE_FIELDS, contacts_json
+
+CONTACTS = 100000
+LIMIT = 1000
+REPEAT = 50
+LIST_FIELDS = ("firstname", "lastname", "phone", "id")
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+    cases = {
+        "entities": (None, CONTACT_RESPONSE_FIELDS),
+        "columns": (list(CONTACT_RESPONSE_FIELDS), CONTACT_RESPONSE_FIELDS),
+        "fields": (list(LIST_FIELDS), LIST_FIELDS),
+    }
+    for name, (columns, fields) in cases.items():
+        async with Session() as session:
+            repository = ContactRepository(session)
+
+            async def page():
+                # New identity map per page like a request session
+                session.expunge_all()
+                contacts = await repository.get_contacts(5000, LIMIT, user, columns=columns)
+                return contacts_json(contacts, fields)
+
+            size = len(await page())
+            print(f"{name:<9} {size:>7} bytes  {await timed(page, REPEAT)}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
@@ -0,0 +1,43 @@
+"""Prefix index build time, memory-bound search and update latency
+
+Run from project root: python -m benchmarks.contacts_suggest
+"""
+import random
+import time
+
+from src.services.prefix_index import PrefixIndex, SuggestItem
+
+SIZES = (10000, 100000)
+QUERIES = ("f", "first12", "last999", "contact5", "zzz")
+REPEAT = 1000
+
+def main():
+    rnd = random.Random(42)
+    for size in SIZES:
+        items = [
+            SuggestItem(
+                i,
+                f"First{rnd.randrange(100000)}",
+                f"Last{rnd.randrange(100000)}",
+                f"contact{i}@example.com",
+            )
+            for i in range(size)
+        ]
+        started = time.perf_counter()
+        index = PrefixIndex(items)
+        build_ms = (time.perf_counter() - started) * 1000
+        print(f"contacts={size:<7} build {build_ms:.1f} ms")
+
+        for query in QUERIES:
+            started = time.perf_counter()
+            for _ in range(REPEAT):
+                index.search(query, 10)
+            print(f"  search {query!r:<11} {(time.perf_counter() - started) / REPEAT * 1000:.4f} ms")
+
+        started = time.perf_counter()
+        for i in range(REPEAT):
+            index.add(SuggestItem(i, f"Renamed{i}", "Contact", f"renamed{i}@example.com"))
+        print(f"  update {(time.perf_counter() - started) / REPEAT * 1000:.4f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Round trips and latency of contact writes: SELECT + commit + refresh vs RETURNING
+
+Run from project root: python -m benchmarks.contacts_write_round_trips [db_url]
+"""
+import asyncio
+import itertools
+import sys
+
+from sqlalchemy import event, select
+
+from benchmarks.common import DEFAULT_DB_URL, seed_contacts, session_factory, timed
+from src.database.models import Contact
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactStatusUpdate, TokenClaims
+
+CONTACTS = 10000
+REPEAT = 200
+
+class RoundTrips:
+    """Count statements and commits sent to the database"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.add)
+        event.listen(engine.sync_engine, "commit", self.add)
+
+    def add(self, *args):
+        self.count += 1
+
+async def select_update_refresh(session, contact_id, user, done):
+    # Write path before UPDATE ... RETURNING
+    contact = (
+        await session.execute(select(Contact).filter_by(id=contact_id, user_id=user.id))
+    ).scalar_one_or_none()
+    if contact:
+        contact.done = done
+        await session.commit()
+        await session.refresh(contact)
+    return contact
+
+async def main(db_url: str):
+    engine = await seed_contacts(db_url, CONTACTS)
+    Session = session_factory(engine)
+    user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+    round_trips = RoundTrips(engine)
+
+    async with Session() as session:
+        repository = ContactRepository(session)
+        # Alternate value so every call writes
+        flips = itertools.cycle((True, False))
+        calls = {
+            "before": lambda: select_update_refresh(session, 42, user, next(flips)),
+            "after": lambda: repository.update_status_contact(
+                42, ContactStatusUpdate(done=next(flips)), user
+            ),
+        }
+        for name, call in calls.items():
+            await call()
+            round_trips.count = 0
+            await call()
+            per_call = round_trips.count
+            print(f"update_status_contact {name:<6} round trips {per_call}  {await timed(call, REPEAT)}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_URL))
@@ -0,0 +1,28 @@
+"""Memory use, false-positive rate and lookup time of the revocation Bloom filter
+
+Run from project root: python -m benchmarks.revocation_bloom
+"""
+import time
+import uuid
+
+from src.conf.config import settings
+from src.services.bloom import BloomFilter
+
+PROBES = 200000
+
+def main():
+    bloom = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+    for _ in range(settings.REVOCATION_BLOOM_CAPACITY):
+        bloom.add(uuid.uuid4().hex)
+
+    probes = [uuid.uuid4().hex for _ in range(PROBES)]
+    started = time.perf_counter()
+    false_positives = sum(probe in bloom for probe in probes)
+    elapsed = time.perf_counter() - started
+
+    print(bloom.stats())
+    print(f"measured error rate   {false_positives / PROBES:.5f}")
+    print(f"lookup                {elapsed / PROBES * 1e6:.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from src.api import utils, contacts, auth, users
+from src.database.db import sessionmanager
+from src.redis.redis import redismanager
+from src.services.birthdays import materialize_birthdays
+from src.services.user_cache import listen_user_invalidations
+from src.services.hashing import hashing_service
+from src.services.revocation import sync_revocations
 from starlette.responses import JSONResponse
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    redis = redismanager.connect()
+    background_tasks = [
+        asyncio.create_task(listen_user_invalidations(redis)),
+        asyncio.create_task(sync_revocations(redis)),
+        asyncio.create_task(materialize_birthdays(redis, sessionmanager.session)),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await redismanager.close()
+    hashing_service.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "<http://localhost:3000>"
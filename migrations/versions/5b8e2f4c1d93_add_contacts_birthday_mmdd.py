@@ -0,0 +1,35 @@
+"""Add indexed birthday month/day to contacts
+
+Revision ID: 5b8e2f4c1d93
+Revises: c7a91e3f5d20
+Create Date: 2026-10-17 15:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f4c1d93'
+down_revision: Union[str, None] = 'c7a91e3f5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_mmdd', sa.SmallInteger(), nullable=True))
+    op.execute(
+        "UPDATE contacts SET birthday_mmdd = "
+        "EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)"
+    )
+    op.alter_column('contacts', 'birthday_mmdd', existing_type=sa.SmallInteger(), nullable=False)
+    op.create_index(
+        'ix_contacts_user_id_birthday_mmdd', 'contacts', ['user_id', 'birthday_mmdd', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_user_id_birthday_mmdd', table_name='contacts')
+    op.drop_column('contacts', 'birthday_mmdd')
@@ -0,0 +1,41 @@
+"""Add indexes for contacts and users access paths
+
+Revision ID: 8d4e0b6c2a17
+Revises: 3f1c2d7a9b64
+Create Date: 2026-10-17 12:40:05.532911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e0b6c2a17'
+down_revision: Union[str, None] = '3f1c2d7a9b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'], unique=False)
+    op.create_index('ix_contacts_user_id_lastname', 'contacts', ['user_id', 'lastname', 'id'], unique=False)
+    op.create_index('ix_contacts_user_id_updated_at', 'contacts', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index(
+        'ix_contacts_user_id_pending',
+        'contacts',
+        ['user_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text('done = false'),
+        sqlite_where=sa.text('done = false'),
+    )
+    op.create_index(op.f('ix_users_password_reset_token'), 'users', ['password_reset_token'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_password_reset_token'), table_name='users')
+    op.drop_index('ix_contacts_user_id_pending', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_updated_at', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_lastname', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
@@ -0,0 +1,28 @@
+"""Add contacts version for optimistic concurrency
+
+Revision ID: e4a7c2b95f18
+Revises: 5b8e2f4c1d93
+Create Date: 2026-10-17 18:24:09.531870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2b95f18'
+down_revision: Union[str, None] = '5b8e2f4c1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('contacts', 'version')
@@ -7,19 +7,26 @@ from src.schemas import (
     UserRole,
     Token,
     TokenRefreshRequest,
+    TokenClaims,
     User,
     RequestEmail,
     ChangePassword,
 )
 from src.services.auth import (
-    create_access_token,
-    create_refresh_token,
-    verify_refresh_token,
+    create_user_access_token,
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    revoke_access_token,
+    get_current_claims,
+    oauth2_scheme,
+    optional_oauth2_scheme,
     get_email_from_token,
     create_email_token,
     change_user_password,
-    Hash,
 )
+from src.services.hashing import hashing_service
+from src.services.refresh_tokens import RefreshTokenService
 from src.services.users import UserService
 from src.database.db import get_db
 from src.redis.redis import get_redis
@@ -64,7 +71,7 @@ async def register_user(
             status_code=status.HTTP_409_CONFLICT,
             detail="Користувач з таким іменем вже існує",
         )
-    user_data.password = Hash().get_password_hash(user_data.password)
+    user_data.password = await hashing_service.get_password_hash(user_data.password)
 
     new_user = await user_service.create_user(
         UserCreate(
@@ -89,6 +96,7 @@ async def login_user(
     Args:
         form_data (OAuth2PasswordRequestForm, optional): Form data with user credentials. Defaults to Depends().
         db (Session, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
 
     Raises:
         HTTPException: HTTP_401_UNAUTHORIZED
@@ -98,7 +106,7 @@ async def login_user(
     """
     user_service = UserService(db)
     user = await user_service.get_user_by_username(form_data.username)
-    if not user or not Hash().verify_password(form_data.password, user.hashed_password):
+    if not user or not await hashing_service.verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неправильний логін або пароль",
@@ -111,11 +119,8 @@ async def login_user(
             detail="Електронна адреса не підтверджена",
         )
 
-    access_token = await create_access_token(data={"sub": user.username})
-    refresh_token = await create_refresh_token(data={"sub": user.username})
-    user.refresh_token = refresh_token
-    redis.delete(str(user.username))
-    await db.commit()
+    access_token = await create_user_access_token(user)
+    refresh_token = await issue_refresh_token(user, redis)
 
     return {
         "access_token": access_token,
@@ -125,27 +130,94 @@ async def login_user(
 
 
 @router.post("/refresh-token", response_model=Token)
-async def new_token(request: TokenRefreshRequest, db: Session = Depends(get_db)):
-    user = await verify_refresh_token(request.refresh_token, db)
-    if user is None:
+async def new_token(
+    request: TokenRefreshRequest, db: Session = Depends(get_db), redis = Depends(get_redis)
+):
+    """Rotate refresh token and issue new access token
+
+    Args:
+        request (TokenRefreshRequest): Current refresh token
+        db (Session, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+
+    Raises:
+        HTTPException: HTTP_401_UNAUTHORIZED
+
+    Returns:
+        JSON with new access and refresh tokens
+    """
+    rotated = await rotate_refresh_token(request.refresh_token, db, redis)
+    if rotated is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
         )
-    new_access_token = await create_access_token(data={"sub": user.username})
+    user, refresh_token = rotated
+    new_access_token = await create_user_access_token(user)
     return {
         "access_token": new_access_token,
-        "refresh_token": request.refresh_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
     }
 
+@router.post("/logout")
+async def logout(
+    request: TokenRefreshRequest,
+    token: str | None = Depends(optional_oauth2_scheme),
+    redis = Depends(get_redis),
+):
+    """Close session of refresh token and revoke access token sent with request
+
+    Args:
+        request (TokenRefreshRequest): Refresh token of session
+        token (str | None, optional): Access token. Defaults to Depends(optional_oauth2_scheme).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+
+    Raises:
+        HTTPException: HTTP_401_UNAUTHORIZED
+
+    Returns:
+        Logout result message
+    """
+    if not await revoke_refresh_token(request.refresh_token, redis):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    if token is not None:
+        await revoke_access_token(token, redis)
+    return {"message": "Сесію завершено"}
+
+@router.post("/logout-all")
+async def logout_all(
+    user: TokenClaims = Depends(get_current_claims),
+    token: str = Depends(oauth2_scheme),
+    redis = Depends(get_redis),
+):
+    """Close all sessions of current user and revoke current access token
+
+    Args:
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+        token (str, optional): Access token. Defaults to Depends(oauth2_scheme).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+
+    Returns:
+        Logout result message
+    """
+    await RefreshTokenService(redis).revoke_all(user.id)
+    await revoke_access_token(token, redis)
+    return {"message": "Усі сесії завершено"}
+
 @router.get("/confirmed_email/{token}")
-async def confirmed_email(token: str, db: Session = Depends(get_db)):
+async def confirmed_email(
+    token: str, db: Session = Depends(get_db), redis = Depends(get_redis)
+):
     """Endpoint for registration confirmation with token from email
 
     Args:
         token (str): Confiramtion token from email
         db (Session, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
 
     Raises:
         HTTPException: HTTP_400_BAD_REQUEST
@@ -154,7 +226,7 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
         Confirmation result message
     """
     email = await get_email_from_token(token)
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     user = await user_service.get_user_by_email(email)
     if user is None:
         raise HTTPException(
@@ -243,6 +315,7 @@ async def change_password(
     background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
+    redis = Depends(get_redis),
 ):
     """Change password with token from email
 
@@ -251,11 +324,12 @@ async def change_password(
         background_tasks (BackgroundTasks): BackgroundTasks handler
         request (Request): _description_
         db (Session, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
 
     Returns:
         JSON result for password email
     """
 
-    await change_user_password(change_password=body, db=db)
+    await change_user_password(change_password=body, db=db, redis=redis)
 
     return {"message": "Пароль змінено"}
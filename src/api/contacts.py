@@ -1,47 +1,389 @@
-from typing import List
-
-from fastapi import APIRouter, HTTPException, Depends, status
+import shutil
+import tempfile
+from datetime import date, datetime
+from typing import Annotated, Awaitable, Callable, List
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    HTTPException,
+    Depends,
+    File,
+    Header,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from enum import Enum
 
-from src.database.db import get_db
+from src.conf.config import settings
+from src.database.db import get_db, get_session_factory
+from src.redis.redis import get_redis
 from src.schemas import (
+    ContactBulkResult,
+    ContactBulkUpdate,
+    ContactIds,
     ContactModel,
     ContactUpdate,
     ContactStatusUpdate,
     ContactResponse,
+    ContactOrder,
+    ContactSuggestion,
+    ImportJob,
+)
+from src.services.contact_versions import (
+    contact_etag,
+    contacts_etag,
+    etag_matches,
+    get_contacts_version,
+    parse_if_match,
 )
 from src.services.contacts import ContactService
-from src.services.auth import get_current_user
-from src.database.models import User
+from src.services.export import EXPORT_MEDIA_TYPES, ExportFormat, export_contacts
+from src.services.importer import ImportFormat, create_job, detect_format, get_job, run_import
+from src.services.auth import get_current_claims
+from src.services.pagination import encode_cursor, decode_cursor
+from src.services.response_cache import CachedResponse, contact_responses
+from src.services.serialization import CONTACT_RESPONSE_FIELDS, contacts_json
+from src.schemas import TokenClaims
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NOT_FOUND_IDS_HEADER = "X-Not-Found-Ids"
+CACHED_HEADERS = (NEXT_CURSOR_HEADER, NOT_FOUND_IDS_HEADER)
+
+def parse_cursor(cursor: str | None, order_by: ContactOrder) -> tuple | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, order_by)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+def user_today(tz: str | None) -> date:
+    if tz is None:
+        return date.today()
+    try:
+        return datetime.now(ZoneInfo(tz)).date()
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid timezone"
+        )
+
+def parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = sorted({int(contact_id) for contact_id in ids.split(",")})
+    except ValueError:
+        parsed = None
+    if not parsed or len(parsed) > settings.CONTACTS_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ids"
+        )
+    return parsed
+
+def set_contact_etag(response: Response, contact) -> None:
+    response.headers["ETag"] = contact_etag(contact.version)
+    response.headers["Cache-Control"] = "private, no-cache"
+
+async def write_failed(
+    contact_service: ContactService, contact_id: int, user: TokenClaims, versions: list[int] | None
+) -> HTTPException:
+    # Conditional update found no row, tell a version conflict from a missing contact
+    if versions is not None and await contact_service.get_contact_version(contact_id, user) is not None:
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Contact was modified"
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+    )
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    if fields is None:
+        return CONTACT_RESPONSE_FIELDS
+    requested = {name.strip() for name in fields.split(",")}
+    if not requested <= set(CONTACT_RESPONSE_FIELDS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid fields"
+        )
+    # Keys keep ContactResponse order whatever the order in query
+    return tuple(name for name in CONTACT_RESPONSE_FIELDS if name in requested)
+
+def select_columns(fields: tuple[str, ...], order_by: ContactOrder) -> list[str] | None:
+    # Whole entities unless fields were narrowed, cursor and not found ids also need id and sort key
+    if fields == CONTACT_RESPONSE_FIELDS:
+        return None
+    columns = list(fields)
+    for column in ("id", order_by.value):
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+async def cached_contacts(
+    redis,
+    user: TokenClaims,
+    version: str | None,
+    endpoint: str,
+    params: dict,
+    fields: tuple[str, ...],
+    response: Response,
+    load: Callable[[], Awaitable[list]],
+) -> Response:
+    # Hits return stored JSON bytes, only misses query and serialize contacts.
+    # Without a known version any entry may be stale, the cache is bypassed.
+    entry = key = None
+    if version is not None:
+        key = contact_responses.key(user.id, version, endpoint, {**params, "fields": fields})
+        entry = await contact_responses.get(redis, key)
+    if entry is None:
+        entry = CachedResponse(
+            contacts_json(await load(), fields),
+            {
+                name.lower(): response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            },
+        )
+        if key is not None:
+            await contact_responses.set(redis, key, entry)
+    headers = {
+        name: value for name, value in response.headers.items() if name != "content-length"
+    }
+    return Response(
+        entry.body, media_type="application/json", headers={**headers, **entry.headers}
+    )
+
+def set_next_cursor(
+    response: Response, contacts: list, limit: int, order_by: ContactOrder
+) -> None:
+    if contacts and len(contacts) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(order_by, contacts[-1])
+
 @router.get("/", response_model=List[ContactResponse])
 async def read_contacts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    order_by: ContactOrder = ContactOrder.id,
+    ids: str | None = None,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Get contacts of current user
+
+    Full pages carry the cursor of the next page in X-Next-Cursor header.
+    With ids all listed contacts are returned at once ordered by id,
+    ids of missing ones are listed in X-Not-Found-Ids header.
+    Responds 304 without querying contacts when If-None-Match has the current ETag,
+    other responses are served from the response cache until contacts change.
+
+    Args:
+        request (Request): HTTP request
+        response (Response): HTTP response
+        skip (int, optional): Skip number of records, ignored with cursor. Defaults to 0.
+        limit (int, optional): Limit number of results. Defaults to 100.
+        cursor (str | None, optional): Cursor of the page from X-Next-Cursor. Defaults to None.
+        order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+        ids (str | None, optional): Comma separated contact ids, up to CONTACTS_BULK_MAX_IDS. Defaults to None.
+        fields (str | None, optional): Comma separated ContactResponse fields to return. Defaults to all.
+        db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Raises:
+        HTTPException: HTTP_400_BAD_REQUEST
+
+    Returns:
+        List of contacts
+    """
+    version = await get_contacts_version(redis, user.id)
+    if version is not None:
+        not_modified = contacts_etag(version, request, response)
+        if not_modified is not None:
+            return not_modified
+    fields = parse_fields(fields)
+    columns = select_columns(fields, order_by)
+    contact_service = ContactService(db)
+    if ids is not None:
+        contact_ids = parse_ids(ids)
+
+        async def load():
+            contacts = await contact_service.get_contacts_by_ids(contact_ids, user, columns)
+            found = {contact.id for contact in contacts}
+            not_found = [contact_id for contact_id in contact_ids if contact_id not in found]
+            if not_found:
+                response.headers[NOT_FOUND_IDS_HEADER] = ",".join(map(str, not_found))
+            return contacts
+
+        params = {"ids": contact_ids}
+    else:
+        after = parse_cursor(cursor, order_by)
+
+        async def load():
+            contacts = await contact_service.get_contacts(
+                skip, limit, user, after, order_by, columns
+            )
+            set_next_cursor(response, contacts, limit, order_by)
+            return contacts
+
+        params = {"skip": skip, "limit": limit, "cursor": cursor, "order_by": order_by}
+    return await cached_contacts(
+        redis, user, version, "list", params, fields, response, load
+    )
+
+
+@router.get("/suggest", response_model=List[ContactSuggestion])
+async def suggest_contacts(
+    q: str = Query(min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: TokenClaims = Depends(get_current_claims),
 ):
+    """Typeahead of contacts by name or email prefix
+
+    Answered from in-memory prefix index of current user, the database
+    is queried only to build the index on first use.
+
+    Args:
+        q (str): Case-insensitive prefix of first name, last name, full name or email
+        limit (int, optional): Limit number of results. Defaults to 10.
+        db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Returns:
+        List of matching contacts
+    """
     contact_service = ContactService(db)
-    contacts = await contact_service.get_contacts(skip, limit, user)
-    return contacts
+    return await contact_service.suggest_contacts(q, limit, user)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts_file(
+    format: ExportFormat = ExportFormat.csv,
+    session_factory = Depends(get_session_factory),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Export all contacts of current user
+
+    Rows are streamed from a server-side cursor in chunks, memory use does
+    not depend on address book size.
+
+    Args:
+        format (ExportFormat, optional): csv or ndjson. Defaults to ExportFormat.csv.
+        session_factory (optional): db session factory. Defaults to Depends(get_session_factory).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Returns:
+        File download with contacts
+    """
+    return StreamingResponse(
+        export_contacts(session_factory, user, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format.value}"'},
+    )
+
+
+def save_upload(file: UploadFile) -> str:
+    # Uploads are closed with the request, background import reads its own copy
+    with tempfile.NamedTemporaryFile(prefix="contacts-import-", delete=False) as copy:
+        shutil.copyfileobj(file.file, copy)
+        return copy.name
+
+
+@router.post("/import", response_model=ImportJob, status_code=status.HTTP_202_ACCEPTED)
+async def import_contacts(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(),
+    format: ImportFormat | None = None,
+    session_factory = Depends(get_session_factory),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Start import of contacts from CSV or vCard file
+
+    Rows are validated like single contacts and inserted in batches by a
+    background job, poll GET /contacts/import/{job_id} for the report.
+
+    Args:
+        background_tasks (BackgroundTasks): Tasks run after response
+        file (UploadFile, optional): CSV with header row or vCard file. Defaults to File().
+        format (ImportFormat | None, optional): File format, guessed from file name when omitted. Defaults to None.
+        session_factory (optional): db session factory. Defaults to Depends(get_session_factory).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Returns:
+        Pending import job
+    """
+    import_format = format or detect_format(file.filename)
+    path = await run_in_threadpool(save_upload, file)
+    job = await create_job(redis, user.id)
+    background_tasks.add_task(
+        run_import, redis, session_factory, user, path, import_format, job
+    )
+    return job
+
+
+@router.get("/import/{job_id}", response_model=ImportJob)
+async def read_import(
+    job_id: str,
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Get progress and report of contacts import
+
+    Args:
+        job_id (str): Import job id
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Raises:
+        HTTPException: HTTP_404_NOT_FOUND
+
+    Returns:
+        Import job
+    """
+    job = await get_job(redis, user.id, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found"
+        )
+    return job
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def read_contact(
     contact_id: int,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """Get contact by id
 
+    ETag is the contact version, responds 304 after reading only the
+    version when If-None-Match has the current ETag.
+
     Args:
         contact_id (int): Contact id
+        response (Response): HTTP response
+        if_none_match (str | None, optional): ETags of cached copies. Defaults to None.
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
 
     Raises:
         HTTPException: HTTP_404_NOT_FOUND
@@ -50,11 +392,19 @@ async def read_contact(
         Contact by id
     """
     contact_service = ContactService(db)
+    if if_none_match:
+        version = await contact_service.get_contact_version(contact_id, user)
+        if version is not None and etag_matches(if_none_match, contact_etag(version)):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": contact_etag(version), "Cache-Control": "private, no-cache"},
+            )
     contact = await contact_service.get_contact(contact_id, user)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    set_contact_etag(response, contact)
     return contact
 
 
@@ -63,148 +413,324 @@ class SearchField(str, Enum):
     firstname = "firstname"
     lastname = "lastname"
     email = "email"
+    all = "all"
 
 @router.get("/search/{field}", response_model=List[ContactResponse])
 async def search_contacts(
     field: SearchField,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     query: str = None,
+    cursor: str | None = None,
+    order_by: ContactOrder = ContactOrder.id,
+    fields: str | None = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """_summary_
 
     Args:
-        field (SearchField): Search field from SearchField enum
-        skip (int, optional): Skip number of records. Defaults to 0.
+        field (SearchField): Search field from SearchField enum, "all" searches every field
+        response (Response): HTTP response
+        skip (int, optional): Skip number of records, ignored with cursor. Defaults to 0.
         limit (int, optional): Limit number of results. Defaults to 100.
-        query (str, optional): Search query. Defaults to None.
+        query (str, optional): Case-insensitive substring to search. Defaults to None.
+        cursor (str | None, optional): Cursor of the page from X-Next-Cursor. Defaults to None.
+        order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+        fields (str | None, optional): Comma separated ContactResponse fields to return. Defaults to all.
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
 
     Returns:
         List of found contacts
     """
+    after = parse_cursor(cursor, order_by)
+    fields = parse_fields(fields)
+    columns = select_columns(fields, order_by)
     contact_service = ContactService(db)
-    contacts = await contact_service.search_contacts(
-        search_field=field, query=query, skip=skip, limit=limit, user=user
+
+    async def load():
+        contacts = await contact_service.search_contacts(
+            search_field=field,
+            query=query,
+            skip=skip,
+            limit=limit,
+            user=user,
+            after=after,
+            order_by=order_by,
+            columns=columns,
+        )
+        set_next_cursor(response, contacts, limit, order_by)
+        return contacts
+
+    params = {
+        "field": field,
+        "query": query,
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+        "order_by": order_by,
+    }
+    version = await get_contacts_version(redis, user.id)
+    return await cached_contacts(
+        redis, user, version, "search", params, fields, response, load
     )
-    return contacts
 
 
 @router.get("/birthdays/", response_model=List[ContactResponse])
 async def birthdays_contacts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    order_by: ContactOrder = ContactOrder.id,
+    days: int = Query(7, ge=0, le=365),
+    tz: str | None = None,
+    fields: str | None = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """Get upcoming birthdays of contacts
 
+    Responses are served from the response cache until contacts change.
+
     Args:
-        skip (int, optional): Skip number of records. Defaults to 0.
+        response (Response): HTTP response
+        skip (int, optional): Skip number of records, ignored with cursor. Defaults to 0.
         limit (int, optional): Limit number of results. Defaults to 100.
+        cursor (str | None, optional): Cursor of the page from X-Next-Cursor. Defaults to None.
+        order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+        days (int, optional): Number of days after today to include. Defaults to 7.
+        tz (str | None, optional): IANA timezone of user, e.g. Europe/Kyiv. Defaults to server timezone.
+        fields (str | None, optional): Comma separated ContactResponse fields to return. Defaults to all.
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Raises:
+        HTTPException: HTTP_400_BAD_REQUEST
 
     Returns:
         List of contacts with upcoming birthdays
     """
-    contact_service = ContactService(db)
-    contacts = await contact_service.birthdays_contacts(skip, limit, user)
-    return contacts
+    after = parse_cursor(cursor, order_by)
+    today = user_today(tz)
+    fields = parse_fields(fields)
+    columns = select_columns(fields, order_by)
+    contact_service = ContactService(db, redis)
+
+    async def load():
+        contacts = await contact_service.birthdays_contacts(
+            skip, limit, user, after, order_by, days, today, columns
+        )
+        set_next_cursor(response, contacts, limit, order_by)
+        return contacts
+
+    # Keyed by local date of user, not timezone, so entries roll over at midnight
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+        "order_by": order_by,
+        "days": days,
+        "today": today,
+    }
+    version = await get_contacts_version(redis, user.id)
+    return await cached_contacts(
+        redis, user, version, "birthdays", params, fields, response, load
+    )
 
 
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
 async def create_contact(
     body: ContactModel,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """Create contact
 
     Args:
         body (ContactModel): Request body
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
 
     Returns:
         Contact creation result
     """
-    contact_service = ContactService(db)
+    contact_service = ContactService(db, redis)
     return await contact_service.create_contact(body, user)
 
+@router.post(
+    "/bulk", response_model=List[ContactResponse], status_code=status.HTTP_201_CREATED
+)
+async def create_contacts(
+    body: Annotated[
+        List[ContactModel], Body(min_length=1, max_length=settings.CONTACTS_BULK_MAX_ITEMS)
+    ],
+    db: AsyncSession = Depends(get_db),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Create contacts in one transaction
+
+    Every item is validated before anything is inserted, errors point to
+    the item by its index in body.
+
+    Args:
+        body (List[ContactModel]): Request body, up to CONTACTS_BULK_MAX_ITEMS contacts
+        db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Returns:
+        Created contacts in order of body
+    """
+    contact_service = ContactService(db, redis)
+    contacts = await contact_service.create_contacts(body, user)
+    return Response(
+        contacts_json(contacts),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+    )
+
+@router.patch("/bulk", response_model=ContactBulkResult)
+async def update_contacts(
+    body: ContactBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Set the same fields on contacts with one UPDATE
+
+    Args:
+        body (ContactBulkUpdate): Request body, up to CONTACTS_BULK_MAX_IDS ids
+        db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Returns:
+        Updated and not found ids
+    """
+    contact_service = ContactService(db, redis)
+    return await contact_service.update_contacts(body.ids, body.fields, user)
+
+@router.delete("/bulk", response_model=ContactBulkResult)
+async def remove_contacts(
+    body: ContactIds,
+    db: AsyncSession = Depends(get_db),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
+):
+    """Remove contacts with one DELETE
+
+    Args:
+        body (ContactIds): Request body, up to CONTACTS_BULK_MAX_IDS ids
+        db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
+
+    Returns:
+        Removed and not found ids
+    """
+    contact_service = ContactService(db, redis)
+    return await contact_service.remove_contacts(body.ids, user)
+
 @router.put("/{contact_id}", response_model=ContactResponse)
 async def update_contact(
     body: ContactUpdate,
     contact_id: int,
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """Update contact
 
+    With If-Match the contact is updated only while it has the version
+    of one of the listed ETags, checked by the UPDATE itself.
+
     Args:
         body (ContactUpdate): Request body
         contact_id (int): Contact id
+        response (Response): HTTP response
+        if_match (str | None, optional): ETags from GET of contact. Defaults to None.
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
 
     Raises:
-        HTTPException: HTTP_404_NOT_FOUND
+        HTTPException: HTTP_404_NOT_FOUND, HTTP_412_PRECONDITION_FAILED
 
     Returns:
         Contact update result
     """
-    contact_service = ContactService(db)
-    contact = await contact_service.update_contact(contact_id, body, user)
+    versions = parse_if_match(if_match)
+    contact_service = ContactService(db, redis)
+    contact = await contact_service.update_contact(contact_id, body, user, versions)
     if contact is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
-        )
+        raise await write_failed(contact_service, contact_id, user, versions)
+    set_contact_etag(response, contact)
     return contact
 
 @router.patch("/{contact_id}", response_model=ContactResponse)
 async def update_status_contact(
     body: ContactStatusUpdate,
     contact_id: int,
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """Update contact status
 
+    With If-Match the contact is updated only while it has the version
+    of one of the listed ETags, checked by the UPDATE itself.
+
     Args:
         body (ContactStatusUpdate): Request body
         contact_id (int): Contact id
+        response (Response): HTTP response
+        if_match (str | None, optional): ETags from GET of contact. Defaults to None.
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
 
     Raises:
-        HTTPException: _description_
+        HTTPException: HTTP_404_NOT_FOUND, HTTP_412_PRECONDITION_FAILED
 
     Returns:
         Contact update result
     """
-    contact_service = ContactService(db)
-    contact = await contact_service.update_status_contact(contact_id, body, user)
+    versions = parse_if_match(if_match)
+    contact_service = ContactService(db, redis)
+    contact = await contact_service.update_status_contact(contact_id, body, user, versions)
     if contact is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
-        )
+        raise await write_failed(contact_service, contact_id, user, versions)
+    set_contact_etag(response, contact)
     return contact
 
 @router.delete("/{contact_id}", response_model=ContactResponse)
 async def remove_contact(
     contact_id: int,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    redis = Depends(get_redis),
+    user: TokenClaims = Depends(get_current_claims),
 ):
     """_summary_
 
     Args:
         contact_id (int): Contact id
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
-        user (User, optional): Current logged user. Defaults to Depends(get_current_user).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+        user (TokenClaims, optional): Current logged user. Defaults to Depends(get_current_claims).
 
     Raises:
         HTTPException: HTTP_404_NOT_FOUND
@@ -212,7 +738,7 @@ async def remove_contact(
     Returns:
         _type_: _description_
     """
-    contact_service = ContactService(db)
+    contact_service = ContactService(db, redis)
     contact = await contact_service.remove_contact(contact_id, user)
     if contact is None:
         raise HTTPException(
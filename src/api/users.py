@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from src.database.db import get_db
-from src.schemas import User
-from src.services.auth import get_current_user, get_current_admin_user
+from src.redis.redis import get_redis
+from src.schemas import User, UserRole
+from src.services.auth import get_current_user
 from src.conf.config import settings
 from src.services.users import UserService
 from src.services.upload_file import UploadFileService
@@ -31,24 +32,32 @@ async def me(request: Request, user: User = Depends(get_current_user)):
 @router.patch("/avatar", response_model=User)
 async def update_avatar_user(
     file: UploadFile = File(),
-    user: User = Depends(get_current_admin_user),
+    user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    redis = Depends(get_redis),
 ):
     """Add user's avatar
 
     Args:
         file (UploadFile, optional): Path to uploaded file. Defaults to File().
-        user (User, optional): Current logged user. Defaults to Depends(get_current_admin_user).
+        user (User, optional): Current logged admin. Defaults to Depends(get_current_user).
         db (AsyncSession, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+
+    Raises:
+        HTTPException: HTTP_403_FORBIDDEN
 
     Returns:
         User object
     """
+    # Role is checked on the user already loaded for this request
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостатньо прав доступу")
     avatar_url = UploadFileService(
         settings.CLOUDINARY_NAME, settings.CLOUDINARY_API_KEY, settings.CLOUDINARY_API_SECRET
     ).upload_file(file, user.username)
 
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     user = await user_service.update_avatar_url(user.email, avatar_url)
 
     return user
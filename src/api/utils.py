@@ -4,6 +4,13 @@ from sqlalchemy import text
 
 from src.database.db import get_db
 from src.redis.redis import get_redis
+from src.schemas import TokenClaims
+from src.services.auth import get_current_admin_user, jwt_claims_cache
+from src.services.user_cache import user_l1_cache, token_version_cache
+from src.services.hashing import hashing_service
+from src.services.revocation import revocation_list
+from src.services.prefix_index import contact_prefix_indexes
+from src.services.response_cache import contact_responses
 
 router = APIRouter(tags=["utils"])
 
@@ -32,8 +39,8 @@ async def healthchecker(db: AsyncSession = Depends(get_db), redis = Depends (get
             )
 
         # Виконуємо тест підключення до Redis
-        redis.set(str("healthcheck"), "SomeData")
-        redis.delete(str("healthcheck"))
+        await redis.set(str("healthcheck"), "SomeData")
+        await redis.delete(str("healthcheck"))
 
         return {"message": "Welcome to FastAPI!"}
     except Exception as e:
@@ -43,6 +50,37 @@ async def healthchecker(db: AsyncSession = Depends(get_db), redis = Depends (get
             detail="Error connecting to the database",
         )
     
+@router.get("/cache-stats")
+async def cache_stats(user: TokenClaims = Depends(get_current_admin_user)):
+    """Cache counters of current worker
+
+    Args:
+        user (TokenClaims, optional): Current logged admin. Defaults to Depends(get_current_admin_user).
+
+    Returns:
+        Size, hit, miss and eviction counters per cache
+    """
+    return {
+        "users": user_l1_cache.stats(),
+        "token_versions": token_version_cache.stats(),
+        "jwt_claims": jwt_claims_cache.stats(),
+        "revoked_tokens": revocation_list.stats(),
+        "contact_prefix_indexes": contact_prefix_indexes.stats(),
+        "contact_responses": contact_responses.stats(),
+    }
+
+@router.get("/hashing-stats")
+async def hashing_stats(user: TokenClaims = Depends(get_current_admin_user)):
+    """Password hashing pool counters of current worker
+
+    Args:
+        user (TokenClaims, optional): Current logged admin. Defaults to Depends(get_current_admin_user).
+
+    Returns:
+        Pending, completed and rejected hashes, queue wait and hash time in seconds
+    """
+    return hashing_service.stats()
+
 @router.get("/headers")
 async def read_headers(user_agent: str = Header(default=None)):
     """Test HTTP headers
@@ -7,11 +7,38 @@ class Settings(BaseSettings):
     REDIS_HOST: str = ""
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    USER_CACHE_L1_SIZE: int = 10000
+    USER_CACHE_L1_TTL: int = 60
+    USER_CACHE_XFETCH_BETA: float = 1.0
+    TOKEN_VERSION_CACHE_SIZE: int = 100000
+    TOKEN_VERSION_CACHE_TTL: int = 60
+
+    CONTACTS_BULK_MAX_ITEMS: int = 1000
+    CONTACTS_BULK_MAX_IDS: int = 5000
+    CONTACTS_IMPORT_BATCH_SIZE: int = 500
+    CONTACTS_IMPORT_MAX_ERRORS: int = 100
+    SUGGEST_INDEX_USERS: int = 1000
+    SUGGEST_INDEX_TTL: int = 300
+    RESPONSE_CACHE_TTL: int = 300
+    RESPONSE_CACHE_MAX_BYTES: int = 262144
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_HASH_USE_PROCESSES: bool = False
 
     JWT_SECRET: str = "jwt_secret"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_SECONDS: int = 3600
     REFRESH_TOKEN_EXPIRATION_MINUTES: int = 60 * 24 * 7
+    JWT_CLAIMS_CACHE_SIZE: int = 10000
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_INTERVAL: float = 1.0
 
     MAIL_USERNAME: EmailStr = "example@meta.ua"
     MAIL_PASSWORD: str = "secretPassword"
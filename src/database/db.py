@@ -34,3 +34,8 @@ sessionmanager = DatabaseSessionManager(settings.DB_URL)
 async def get_db():
     async with sessionmanager.session() as session:
         yield session
+
+def get_session_factory():
+    """Session factory for work that outlives the request dependencies,
+    e.g. streaming responses and background jobs"""
+    return sessionmanager.session
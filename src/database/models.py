@@ -1,14 +1,40 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, func, Table, Enum as SqlEnum
-from sqlalchemy.orm import relationship, mapped_column, Mapped, DeclarativeBase
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, func, Table, Index, text, event, DDL, Enum as SqlEnum
+from sqlalchemy.orm import relationship, mapped_column, Mapped, DeclarativeBase, validates
 from sqlalchemy.sql.schema import ForeignKey, PrimaryKeyConstraint
 from sqlalchemy.sql.sqltypes import DateTime
+from sqlalchemy.dialects import sqlite
 from src.schemas import UserRole
 
+# SQLite stores func.now() as text without fractional seconds, bound values
+# must have the same format to compare with stored ones
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
 class Base(DeclarativeBase):
     pass
 
+def birthday_key(birthday: date | str) -> int:
+    """Month and day of birthday as MMDD number, comparable within a year
+
+    Args:
+        birthday (date | str): Birthday date, datetime or ISO string
+
+    Returns:
+        int
+    """
+    if isinstance(birthday, str):
+        birthday = date.fromisoformat(birthday[:10])
+    return birthday.month * 100 + birthday.day
+
+def _default_birthday_mmdd(context) -> int:
+    return birthday_key(context.get_current_parameters()["birthday"])
+
 class Contact(Base):
     __tablename__ = "contacts"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -17,19 +43,56 @@ class Contact(Base):
     email: Mapped[str] = mapped_column(String(255), nullable=False)
     phone: Mapped[str] = mapped_column(String(16), nullable=False)
     birthday: Mapped[str] = mapped_column(DateTime, nullable=False)
+    # Derived from birthday for indexed upcoming birthdays lookups
+    birthday_mmdd: Mapped[int] = mapped_column(
+        SmallInteger, nullable=False, default=_default_birthday_mmdd
+    )
     created_at: Mapped[datetime] = mapped_column(
-        "created_at", DateTime, default=func.now()
+        "created_at", Timestamp, default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
-        "updated_at", DateTime, default=func.now(), onupdate=func.now()
+        "updated_at", Timestamp, default=func.now(), onupdate=func.now()
     )
     description: Mapped[str] = mapped_column(String(255), nullable=False)
     done: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Incremented by every update, compared by conditional updates
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
     user_id = Column(
         "user_id", ForeignKey("users.id", ondelete="CASCADE"), default=None
     )
     user = relationship("User", backref="notes")
 
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_lastname", "user_id", "lastname", "id"),
+        Index("ix_contacts_user_id_updated_at", "user_id", "updated_at", "id"),
+        Index("ix_contacts_user_id_birthday_mmdd", "user_id", "birthday_mmdd", "id"),
+        Index(
+            "ix_contacts_user_id_pending",
+            "user_id",
+            "id",
+            postgresql_where=text("done = false"),
+            sqlite_where=text("done = false"),
+        ),
+        # Substring search, SQLite uses contacts_fts table instead
+        *(
+            Index(
+                f"ix_contacts_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("firstname", "lastname", "email")
+        ),
+    )
+
+    @validates("birthday")
+    def _set_birthday_mmdd(self, key, birthday):
+        self.birthday_mmdd = birthday_key(birthday)
+        return birthday
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
@@ -41,4 +104,51 @@ class User(Base):
     avatar = Column(String(255), nullable=True)
     confirmed = Column(Boolean, default=False)
     refresh_token = Column(String, nullable=True)
-    password_reset_token = Column(String, nullable=True)
+    password_reset_token = Column(String, nullable=True, index=True)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+
+
+# Trigram full-text index over searchable contact fields on SQLite,
+# kept in sync with contacts by triggers
+CONTACTS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        firstname, lastname, email,
+        content='contacts', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, firstname, lastname, email)
+        VALUES (new.id, new.firstname, new.lastname, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, firstname, lastname, email)
+        VALUES ('delete', old.id, old.firstname, old.lastname, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_update
+    AFTER UPDATE OF firstname, lastname, email ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, firstname, lastname, email)
+        VALUES ('delete', old.id, old.firstname, old.lastname, old.email);
+        INSERT INTO contacts_fts(rowid, firstname, lastname, email)
+        VALUES (new.id, new.firstname, new.lastname, new.email);
+    END
+    """,
+]
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for statement in CONTACTS_FTS_DDL:
+    event.listen(Contact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Contact.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite"),
+)
@@ -1,6 +1,44 @@
-import redis
+import redis.asyncio as redis
 from src.conf.config import settings
 
-def get_redis():
-    client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, password=settings.REDIS_PASSWORD, db=0)
-    return client
+class RedisSessionManager:
+    def __init__(self):
+        self._pool: redis.ConnectionPool | None = None
+        self._client: redis.Redis | None = None
+
+    def connect(self):
+        """Create process-wide connection pool and client"""
+        if self._client is not None:
+            return self._client
+        self._pool = redis.ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            db=0,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        self._client = redis.Redis(connection_pool=self._pool)
+        return self._client
+
+    async def close(self):
+        """Close client and disconnect all pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            await self._pool.disconnect()
+        self._client = None
+        self._pool = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            raise Exception("Redis client is not initialized")
+        return self._client
+
+redismanager = RedisSessionManager()
+
+async def get_redis():
+    return redismanager.client
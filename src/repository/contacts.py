@@ -1,33 +1,163 @@
-from typing import List
-
-from datetime import datetime, timedelta
-
-from sqlalchemy import select
+from typing import AsyncIterator, List, Sequence
+
+from datetime import date
+
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    delete,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.database.models import Contact, User
-from src.schemas import ContactModel, ContactUpdate, ContactStatusUpdate
+from src.database.models import Contact, User, birthday_key
+from src.schemas import ContactModel, ContactPatch, ContactUpdate, ContactStatusUpdate, ContactOrder
+from src.services.birthdays import (
+    BIRTHDAYS_MAX_IDS,
+    birthday_window,
+    get_birthday_ids,
+    remove_birthday,
+    remove_birthdays,
+    update_birthday,
+    update_birthdays,
+)
+from src.services.contact_versions import bump_contacts_version
+from src.services.prefix_index import SuggestItem, contact_prefix_indexes
+
+
+def paginate(
+    stmt: Select,
+    skip: int,
+    limit: int,
+    after: tuple | None = None,
+    order_by: ContactOrder = ContactOrder.id,
+) -> Select:
+    """Apply stable order and keyset or offset pagination
+
+    Args:
+        stmt (Select): Contacts query
+        skip (int): Skip n-records, ignored when after is set
+        limit (int): Limit amount of results
+        after (tuple | None, optional): Last sort key and id of previous page. Defaults to None.
+        order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+
+    Returns:
+        Select
+    """
+    if order_by == ContactOrder.id:
+        stmt = stmt.order_by(Contact.id)
+        if after is not None:
+            stmt = stmt.where(Contact.id > after[1])
+    else:
+        column = getattr(Contact, order_by.value)
+        stmt = stmt.order_by(column, Contact.id)
+        if after is not None:
+            # Bind the key with the column type so it is stored and compared alike
+            key = literal(after[0], column.type)
+            stmt = stmt.where(tuple_(column, Contact.id) > tuple_(key, after[1]))
+    if after is None:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def contact_select(columns: Sequence[str] | None = None) -> Select:
+    """Select whole contacts, or only given columns as lightweight rows
+
+    Args:
+        columns (Sequence[str] | None, optional): Contact column names. Defaults to None.
+
+    Returns:
+        Select
+    """
+    if columns is None:
+        return select(Contact)
+    return select(*(getattr(Contact, column) for column in columns))
+
+
+SEARCH_FIELDS = ("firstname", "lastname", "email")
+# FTS5 trigram tokenizer matches only queries of at least 3 characters
+FTS_MIN_QUERY_LENGTH = 3
+contacts_fts = table("contacts_fts", literal_column("rowid"))
 
 
 class ContactRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, redis=None):
         self.db = session
-
-    async def get_contacts(self, skip: int, limit: int, user: User) -> List[Contact]:
+        self.redis = redis
+
+    async def update_materialized(self, contact: Contact) -> None:
+        if self.redis is not None:
+            await update_birthday(self.redis, contact.user_id, contact.id, contact.birthday_mmdd)
+
+    async def fetch(self, stmt: Select, columns: Sequence[str] | None) -> List[Contact] | List[Row]:
+        result = await self.db.execute(stmt)
+        return result.all() if columns is not None else result.scalars().all()
+
+    async def bump_version(self, user_id: int) -> None:
+        if self.redis is not None:
+            await bump_contacts_version(self.redis, user_id)
+
+    async def get_contacts(
+        self,
+        skip: int,
+        limit: int,
+        user: User,
+        after: tuple | None = None,
+        order_by: ContactOrder = ContactOrder.id,
+        columns: Sequence[str] | None = None,
+    ) -> List[Contact] | List[Row]:
         """Get all contcts for current user
 
         Args:
             skip (int): Skip n-records
             limit (int): Limit amount of results
             user (User): Current user
+            after (tuple | None, optional): Keyset cursor position. Defaults to None.
+            order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+            columns (Sequence[str] | None, optional): Select only these columns as rows. Defaults to None.
 
         Returns:
             List[ of contacts
         """
-        stmt = select(Contact).filter_by(user=user).offset(skip).limit(limit)
-        contacts = await self.db.execute(stmt)
-        return contacts.scalars().all()
+        stmt = paginate(
+            contact_select(columns).filter_by(user_id=user.id), skip, limit, after, order_by
+        )
+        return await self.fetch(stmt, columns)
+
+    def search_condition(self, search_field: str, query: str) -> ColumnElement:
+        """Case-insensitive substring condition backed by an index
+
+        PostgreSQL uses pg_trgm GIN indexes through ILIKE, SQLite uses
+        the contacts_fts trigram table.
+
+        Args:
+            search_field (str): Field name firstname|lastname|email|all
+            query (str): Search query
+
+        Returns:
+            Where clause
+        """
+        search_field = getattr(search_field, "value", search_field)
+        fields = SEARCH_FIELDS if search_field == "all" else (search_field,)
+        if self.db.get_bind().dialect.name == "sqlite" and len(query) >= FTS_MIN_QUERY_LENGTH:
+            phrase = '"' + query.replace('"', '""') + '"'
+            match = "{" + " ".join(fields) + "} : " + phrase
+            return Contact.id.in_(
+                select(contacts_fts.c.rowid).where(
+                    literal_column("contacts_fts").op("MATCH")(match)
+                )
+            )
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return or_(*(getattr(Contact, field).ilike(pattern, escape="\\") for field in fields))
 
     async def get_contact_by_id(self, contact_id: int, user: User) -> Contact | None:
         """Get contact by id
@@ -39,10 +169,48 @@ class ContactRepository:
         Returns:
             Contact | None
         """
-        stmt = select(Contact).filter_by(id=contact_id, user=user)
+        stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
         contact = await self.db.execute(stmt)
         return contact.scalar_one_or_none()
 
+    async def stream_contacts(
+        self, user: User, columns: Sequence[str], chunk_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Stream all contacts of user through server-side cursor
+
+        Args:
+            user (User): Current user
+            columns (Sequence[str]): Contact column names to select
+            chunk_size (int): Rows fetched per chunk
+
+        Yields:
+            Chunks of rows ordered by id
+        """
+        stmt = (
+            contact_select(columns)
+            .filter_by(user_id=user.id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_suggest_items(self, user: User) -> List[SuggestItem]:
+        """Load names and emails of all contacts for prefix index
+
+        Args:
+            user (User): Current user
+
+        Returns:
+            List of SuggestItem
+        """
+        stmt = select(
+            Contact.id, Contact.firstname, Contact.lastname, Contact.email
+        ).filter_by(user_id=user.id)
+        rows = await self.db.execute(stmt)
+        return [SuggestItem(*row) for row in rows]
+
     async def create_contact(self, body: ContactModel, user: User) -> Contact:
         """Create new contact
 
@@ -54,14 +222,69 @@ class ContactRepository:
             Contact: object of created contact
         """
         contact = Contact(
-            **body.model_dump(exclude={"tags"}, exclude_unset=True), user=user
+            **body.model_dump(exclude={"tags"}, exclude_unset=True), user_id=user.id
         )
         self.db.add(contact)
         await self.db.commit()
         await self.db.refresh(contact)
+        contact_prefix_indexes.add(user.id, contact)
+        await self.update_materialized(contact)
+        await self.bump_version(user.id)
         return contact
         ##return await self.get_contact_by_id(contact.id, user=user)
 
+    async def create_contacts(self, bodies: List[ContactModel], user: User) -> List[Contact]:
+        """Create contacts with one multi-row INSERT ... RETURNING in one transaction
+
+        Args:
+            bodies (List[ContactModel]): Contact models
+            user (User): Current user
+
+        Returns:
+            List of created contacts in order of bodies
+        """
+        rows = []
+        for body in bodies:
+            row = body.model_dump(exclude={"tags"}, exclude_unset=True)
+            row["birthday_mmdd"] = birthday_key(row["birthday"])
+            row["user_id"] = user.id
+            rows.append(row)
+        result = await self.db.scalars(
+            insert(Contact).returning(Contact, sort_by_parameter_order=True), rows
+        )
+        contacts = result.all()
+        # Keep loaded rows readable after commit without a refresh per contact
+        for contact in contacts:
+            self.db.expunge(contact)
+        await self.db.commit()
+        for contact in contacts:
+            contact_prefix_indexes.add(user.id, contact)
+        if self.redis is not None:
+            await update_birthdays(
+                self.redis, user.id, [(contact.id, contact.birthday_mmdd) for contact in contacts]
+            )
+        await self.bump_version(user.id)
+        return contacts
+
+    async def write_returning(self, stmt) -> Contact | None:
+        """Run UPDATE or DELETE of one contact with RETURNING and commit
+
+        Args:
+            stmt: Update or Delete statement filtered by id and user_id
+
+        Returns:
+            Contact | None
+        """
+        result = await self.db.execute(
+            stmt.returning(Contact).execution_options(synchronize_session=False)
+        )
+        contact = result.scalar_one_or_none()
+        if contact is not None:
+            # Returned columns stay readable after commit without a refresh
+            self.db.expunge(contact)
+        await self.db.commit()
+        return contact
+
     async def remove_contact(self, contact_id: int, user: User) -> Contact | None:
         """Remove contact
 
@@ -72,14 +295,57 @@ class ContactRepository:
         Returns:
             Contact
         """
-        contact = await self.get_contact_by_id(contact_id, user)
+        contact = await self.write_returning(
+            delete(Contact).filter_by(id=contact_id, user_id=user.id)
+        )
         if contact:
-            await self.db.delete(contact)
-            await self.db.commit()
+            contact_prefix_indexes.remove(user.id, contact_id)
+            if self.redis is not None:
+                await remove_birthday(self.redis, user.id, contact_id)
+            await self.bump_version(user.id)
         return contact
 
+    async def get_contact_version(self, contact_id: int, user: User) -> int | None:
+        """Get current version of contact
+
+        Args:
+            contact_id (int): Contact id
+            user (User): Current user
+
+        Returns:
+            Version or None when contact does not exist
+        """
+        stmt = select(Contact.version).filter_by(id=contact_id, user_id=user.id)
+        return (await self.db.execute(stmt)).scalar_one_or_none()
+
+    def versioned_update(
+        self, contact_id: int, user: User, versions: List[int] | None
+    ):
+        """UPDATE of one contact that increments its version
+
+        Args:
+            contact_id (int): Contact id
+            user (User): Current user
+            versions (List[int] | None): Versions the contact must have, any when None
+
+        Returns:
+            Update statement
+        """
+        stmt = (
+            update(Contact)
+            .filter_by(id=contact_id, user_id=user.id)
+            .values(version=Contact.version + 1)
+        )
+        if versions is not None:
+            stmt = stmt.where(Contact.version.in_(versions))
+        return stmt
+
     async def update_contact(
-        self, contact_id: int, body: ContactUpdate, user: User
+        self,
+        contact_id: int,
+        body: ContactUpdate,
+        user: User,
+        versions: List[int] | None = None,
     ) -> Contact | None:
         """Update contact
 
@@ -87,22 +353,29 @@ class ContactRepository:
             contact_id (int): Contact id
             body (ContactUpdate): Contact update data
             user (User): Current user
+            versions (List[int] | None, optional): Versions the contact must have. Defaults to None.
 
         Returns:
-            Contact | None
+            Contact | None, None also when contact has another version
         """
-        contact = await self.get_contact_by_id(contact_id, user)
+        values = body.model_dump(exclude={"tags"}, exclude_unset=True)
+        if "birthday" in values:
+            values["birthday_mmdd"] = birthday_key(values["birthday"])
+        contact = await self.write_returning(
+            self.versioned_update(contact_id, user, versions).values(**values)
+        )
         if contact:
-            for key, value in body.model_dump(exclude={"tags"}, exclude_unset=True).items():
-                setattr(contact, key, value)
-
-            await self.db.commit()
-            await self.db.refresh(contact)
-
+            contact_prefix_indexes.add(user.id, contact)
+            await self.update_materialized(contact)
+            await self.bump_version(user.id)
         return contact
 
     async def update_status_contact(
-        self, contact_id: int, body: ContactStatusUpdate, user: User
+        self,
+        contact_id: int,
+        body: ContactStatusUpdate,
+        user: User,
+        versions: List[int] | None = None,
     ) -> Contact | None:
         """Update contact status
 
@@ -110,64 +383,170 @@ class ContactRepository:
             contact_id (int): Contact id
             body (ContactStatusUpdate): Contact status
             user (User): Current user
+            versions (List[int] | None, optional): Versions the contact must have. Defaults to None.
 
         Returns:
-            Contact | None
+            Contact | None, None also when contact has another version
         """
-        contact = await self.get_contact_by_id(contact_id, user)
+        contact = await self.write_returning(
+            self.versioned_update(contact_id, user, versions).values(done=body.done)
+        )
         if contact:
-            contact.done = body.done
-            await self.db.commit()
-            await self.db.refresh(contact)
+            await self.bump_version(user.id)
         return contact
 
+    async def get_contacts_by_ids(
+        self, ids: List[int], user: User, columns: Sequence[str] | None = None
+    ) -> List[Contact] | List[Row]:
+        """Get contacts of current user by ids
+
+        Args:
+            ids (List[int]): Contact ids
+            user (User): Current user
+            columns (Sequence[str] | None, optional): Select only these columns as rows. Defaults to None.
+
+        Returns:
+            Found contacts ordered by id
+        """
+        stmt = (
+            contact_select(columns)
+            .filter_by(user_id=user.id)
+            .where(Contact.id.in_(ids))
+            .order_by(Contact.id)
+        )
+        return await self.fetch(stmt, columns)
+
+    async def update_contacts(self, ids: List[int], body: ContactPatch, user: User) -> List[int]:
+        """Set fields on contacts of current user with one UPDATE
+
+        Args:
+            ids (List[int]): Contact ids
+            body (ContactPatch): Fields to set
+            user (User): Current user
+
+        Returns:
+            Ids of updated contacts
+        """
+        values = body.model_dump(exclude_unset=True)
+        if "birthday" in values:
+            values["birthday_mmdd"] = birthday_key(values["birthday"])
+        stmt = (
+            update(Contact)
+            .where(Contact.user_id == user.id, Contact.id.in_(ids))
+            .values(**values, version=Contact.version + 1)
+            .returning(Contact.id, Contact.firstname, Contact.lastname, Contact.email, Contact.birthday_mmdd)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        await self.db.commit()
+        for row in rows:
+            contact_prefix_indexes.add(user.id, row)
+        if self.redis is not None and "birthday" in values:
+            await update_birthdays(self.redis, user.id, [(row.id, row.birthday_mmdd) for row in rows])
+        if rows:
+            await self.bump_version(user.id)
+        return [row.id for row in rows]
+
+    async def remove_contacts(self, ids: List[int], user: User) -> List[int]:
+        """Remove contacts of current user with one DELETE
+
+        Args:
+            ids (List[int]): Contact ids
+            user (User): Current user
+
+        Returns:
+            Ids of removed contacts
+        """
+        stmt = (
+            delete(Contact)
+            .where(Contact.user_id == user.id, Contact.id.in_(ids))
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        removed = (await self.db.execute(stmt)).scalars().all()
+        await self.db.commit()
+        for contact_id in removed:
+            contact_prefix_indexes.remove(user.id, contact_id)
+        if self.redis is not None:
+            await remove_birthdays(self.redis, user.id, removed)
+        if removed:
+            await self.bump_version(user.id)
+        return removed
+
     async def search_contacts(
-        self, search_field: str, query: str, skip: int, limit: int, user: User
-    ) -> List[Contact]:
+        self,
+        search_field: str,
+        query: str,
+        skip: int,
+        limit: int,
+        user: User,
+        after: tuple | None = None,
+        order_by: ContactOrder = ContactOrder.id,
+        columns: Sequence[str] | None = None,
+    ) -> List[Contact] | List[Row]:
         """Search contacts by fieldname and query
 
         Args:
-            search_field (str): Field name firstname|lastname|email
-            query (str): Search query
+            search_field (str): Field name firstname|lastname|email|all
+            query (str): Search query, all contacts match an empty query
             skip (int): Skip n-records
             limit (int): Limit amount of results
             user (User): Current user
+            after (tuple | None, optional): Keyset cursor position. Defaults to None.
+            order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+            columns (Sequence[str] | None, optional): Select only these columns as rows. Defaults to None.
 
         Returns:
             List of contacts matching search query
         """
-        stmt = (
-            select(Contact)
-            .filter_by(user=user)
-            .where(Contact.__dict__[search_field].like(f"%{query}%"))
-            .offset(skip)
-            .limit(limit)
-        )
-        contacts = await self.db.execute(stmt)
-        return contacts.scalars().all()
+        stmt = contact_select(columns).filter_by(user_id=user.id)
+        if query:
+            stmt = stmt.where(self.search_condition(search_field, query))
+        stmt = paginate(stmt, skip, limit, after, order_by)
+        return await self.fetch(stmt, columns)
 
     async def birthdays_contacts(
-        self, skip: int, limit: int, user: User
-    ) -> List[Contact]:
-        """Fetch contacts with birthday in next 7 days
+        self,
+        skip: int,
+        limit: int,
+        user: User,
+        after: tuple | None = None,
+        order_by: ContactOrder = ContactOrder.id,
+        days: int = 7,
+        today: date | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> List[Contact] | List[Row]:
+        """Fetch contacts with birthday in next days
+
+        Ids are taken from materialized birthdays in Redis when they cover
+        the window, otherwise the window is matched by SQL.
 
         Args:
             skip (int): Skip n-records
             limit (int): Limit amount of results
             user (User): Current user
+            after (tuple | None, optional): Keyset cursor position. Defaults to None.
+            order_by (ContactOrder, optional): Sort key. Defaults to ContactOrder.id.
+            days (int, optional): Window length after today. Defaults to 7.
+            today (date | None, optional): Current date of user. Defaults to server date.
+            columns (Sequence[str] | None, optional): Select only these columns as rows. Defaults to None.
 
         Returns:
             List of contacts
         """
-        today = datetime.today().date()
-        next_week = today + timedelta(days=7)
-
-        stmt = (
-            select(Contact)
-            .filter_by(user=user)
-            .where(Contact.birthday.between(today, next_week))
-            .offset(skip)
-            .limit(limit)
+        today = today or date.today()
+        condition = birthday_window(today, days)
+        if self.redis is not None:
+            ids = await get_birthday_ids(self.redis, user.id, today, days)
+            if ids is not None and len(ids) <= BIRTHDAYS_MAX_IDS:
+                if not ids:
+                    return []
+                condition = Contact.id.in_(ids)
+        stmt = paginate(
+            contact_select(columns).filter_by(user_id=user.id).where(condition),
+            skip,
+            limit,
+            after,
+            order_by,
         )
-        contacts = await self.db.execute(stmt)
-        return contacts.scalars().all()
+        return await self.fetch(stmt, columns)
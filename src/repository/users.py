@@ -1,28 +1,34 @@
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import UserCreate
+from src.services.user_cache import invalidate_user
 
 class UserRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, redis=None):
         self.db = session
+        self.redis = redis
+
+    async def invalidate_cache(self, username: str) -> None:
+        if self.redis is not None:
+            await invalidate_user(self.redis, username)
 
     async def get_user_by_id(self, user_id: int) -> User | None:
         stmt = select(User).filter_by(id=user_id)
         user = await self.db.execute(stmt)
         return user.scalar_one_or_none()
 
+    async def get_token_version(self, user_id: int) -> int | None:
+        stmt = select(User.token_version).filter_by(id=user_id)
+        version = await self.db.execute(stmt)
+        return version.scalar_one_or_none()
+
     async def get_user_by_username(self, username: str) -> User | None:
         stmt = select(User).filter_by(username=username)
         user = await self.db.execute(stmt)
         return user.scalar_one_or_none()
 
-    async def get_user_by_refresh_token(self, username: str, refresh_token: str) -> User | None:
-        stmt = select(User).filter_by(username=username).filter_by(refresh_token=refresh_token)
-        user = await self.db.execute(stmt)
-        return user.scalar_one_or_none()
-
     async def get_user_by_password_token(self, password_token: str) -> User | None:
         stmt = select(User).filter_by(password_reset_token=password_token)
         user = await self.db.execute(stmt)
@@ -45,13 +51,31 @@ class UserRepository:
         return user
 
     async def confirmed_email(self, email: str) -> None:
-        user = await self.get_user_by_email(email)
-        user.confirmed = True
+        stmt = (
+            update(User)
+            .filter_by(email=email)
+            .values(confirmed=True)
+            .returning(User.username)
+            .execution_options(synchronize_session=False)
+        )
+        username = (await self.db.execute(stmt)).scalar_one_or_none()
         await self.db.commit()
+        if username is not None:
+            await self.invalidate_cache(username)
 
-    async def update_avatar_url(self, email: str, url: str) -> User:
-        user = await self.get_user_by_email(email)
-        user.avatar = url
+    async def update_avatar_url(self, email: str, url: str) -> User | None:
+        stmt = (
+            update(User)
+            .filter_by(email=email)
+            .values(avatar=url)
+            .returning(User)
+            .execution_options(synchronize_session=False)
+        )
+        user = (await self.db.execute(stmt)).scalar_one_or_none()
+        if user is not None:
+            # Returned columns stay readable after commit without a refresh
+            self.db.expunge(user)
         await self.db.commit()
-        await self.db.refresh(user)
+        if user is not None:
+            await self.invalidate_cache(user.username)
         return user
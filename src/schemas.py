@@ -1,7 +1,9 @@
 from datetime import datetime, date
 from typing import List, Optional
 from enum import Enum
-from pydantic import BaseModel, Field, field_validator, ConfigDict, EmailStr
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict, EmailStr
+
+from src.conf.config import settings
 import re
 
 PHONE_REGEX = re.compile(r"^\+?\d{1,3}?[-.\s]?\(?\d{1,4}?\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}$")
@@ -30,14 +32,83 @@ class ContactUpdate(ContactModel):
 class ContactStatusUpdate(BaseModel):
     done: bool
 
+class ContactPatch(BaseModel):
+    """Fields to set on several contacts, at least one is required"""
+    firstname: str | None = Field(None, max_length=50)
+    lastname: str | None = Field(None, max_length=50)
+    email: EmailStr | None = Field(None, max_length=255)
+    phone: str | None = Field(None, max_length=16)
+    birthday: date | None = None
+    description: str | None = Field(None, max_length=255)
+    done: bool | None = None
+
+    @field_validator("phone")
+    @classmethod
+    def validate_phone(cls, value: str | None) -> str | None:
+        return ContactBase.validate_phone(value) if value is not None else value
+
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        if not self.model_fields_set:
+            raise ValueError("No fields to update")
+        for field in self.model_fields_set:
+            if getattr(self, field) is None:
+                raise ValueError(f"{field} can not be null")
+        return self
+
+class ContactIds(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=settings.CONTACTS_BULK_MAX_IDS)
+
+class ContactBulkUpdate(ContactIds):
+    fields: ContactPatch
+
+class ContactBulkResult(BaseModel):
+    affected: List[int]
+    not_found: List[int]
+
+class ContactOrder(str, Enum):
+    """Sort keys available for keyset pagination, id breaks ties"""
+    id = "id"
+    lastname = "lastname"
+    updated_at = "updated_at"
+
 class ContactResponse(ContactBase):
     id: int
     done: bool
+    version: int
     created_at: datetime | None
     updated_at: Optional[datetime] | None
 
     model_config = ConfigDict(from_attributes=True)
 
+class ContactSuggestion(BaseModel):
+    id: int
+    firstname: str
+    lastname: str
+    email: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ImportStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportJob(BaseModel):
+    """Progress and report of contacts import"""
+    id: str
+    status: ImportStatus = ImportStatus.pending
+    processed: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    errors: List[ImportRowError] = []
+    detail: str | None = None
+
 class UserRole(str, Enum):
     USER = "USER"
     MODERATOR = "MODERATOR"
@@ -52,6 +123,27 @@ class User(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class UserSnapshot(BaseModel):
+    """Minimal user data kept in the auth cache"""
+    id: int
+    username: str
+    email: str
+    role: UserRole
+    avatar: str | None = None
+    confirmed: bool = False
+    token_version: int = 0
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+class TokenClaims(BaseModel):
+    """Verified access token claims, enough for role and ownership checks"""
+    id: int
+    username: str
+    role: UserRole
+    token_version: int
+
+    model_config = ConfigDict(frozen=True)
+
 class UserRegister(BaseModel):
     username: str
     email: str
@@ -1,22 +1,34 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, timezone, UTC
 from typing import Optional, Literal
 
-import pickle
-
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
+from pydantic import ValidationError
 
-from src.database.db import get_db
+from src.database.db import get_db, sessionmanager
 from src.conf.config import settings
 from src.services.users import UserService
 from src.redis.redis import get_redis
-from src.schemas import UserRole, User, ChangePassword
+from src.schemas import UserRole, User, UserSnapshot, TokenClaims, ChangePassword
+from src.services.user_cache import (
+    get_user,
+    fetch_user,
+    get_token_version,
+    invalidate_user,
+    invalidate_token_version,
+)
+from src.services.hashing import pwd_context, hashing_service
+from src.services.cache import LRUCache
+from src.services.refresh_tokens import RefreshTokenService
+from src.services.revocation import revocation_list
 
 class Hash:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = pwd_context
 
     def verify_password(self, plain_password, hashed_password):
         return self.pwd_context.verify(plain_password, hashed_password)
@@ -25,6 +37,10 @@ class Hash:
         return self.pwd_context.hash(password)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+# Verified access token payloads by token digest, kept until token exp
+jwt_claims_cache = LRUCache(maxsize=settings.JWT_CLAIMS_CACHE_SIZE)
 
 def create_token(
     data: dict, expires_delta: timedelta, token_type: Literal["access", "refresh"]
@@ -43,12 +59,31 @@ async def create_access_token(data: dict, expires_delta: Optional[int] = None):
     else:
         expire = timedelta(seconds=settings.JWT_EXPIRATION_SECONDS)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
 
     encoded_jwt = create_token(
         to_encode, timedelta(seconds=settings.JWT_EXPIRATION_SECONDS), "access"
     )
     return encoded_jwt
 
+async def create_user_access_token(user) -> str:
+    """Create access token with claims for authorization without user lookup
+
+    Args:
+        user: User or UserSnapshot
+
+    Returns:
+        Encoded JWT with sub, uid, role and ver claims
+    """
+    return await create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "role": UserRole(user.role).value,
+            "ver": user.token_version,
+        }
+    )
+
 async def create_refresh_token(data: dict, expires_delta: Optional[float] = None):
     if expires_delta:
         refresh_token = create_token(data, expires_delta, "refresh")
@@ -58,70 +93,237 @@ async def create_refresh_token(data: dict, expires_delta: Optional[float] = None
         )
     return refresh_token
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db), redis = Depends (get_redis)
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def load_user_snapshot(db: Session, username: str) -> UserSnapshot | None:
+    user_service = UserService(db)
+    user = await user_service.get_user_by_username(username)
+    if user is None:
+        return None
+    return UserSnapshot.model_validate(user)
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def decode_access_token(token: str) -> dict:
+    """Verify access token, reusing cached payload of already verified tokens
+
+    Args:
+        token (str): Encoded JWT
+
+    Raises:
+        HTTPException: HTTP_401_UNAUTHORIZED
+
+    Returns:
+        Token payload, must not be modified
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = jwt_claims_cache.get(key)
+    if payload is not None:
+        return payload
 
     try:
         # Decode JWT
         payload = jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
-        username = payload["sub"]
-        if username is None:
-            raise credentials_exception
     except JWTError as e:
         raise credentials_exception
+    # Refresh and email tokens are signed with the same key
+    if payload.get("sub") is None or payload.get("token_type") != "access":
+        raise credentials_exception
 
-    user = redis.get(str(username))
-    if user is None:
-        user_service = UserService(db)
-        user = await user_service.get_user_by_username(username)
-        if user is None:
-            raise credentials_exception
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        jwt_claims_cache.set(key, payload, ttl=ttl)
+    return payload
 
-        redis.set(str(username), pickle.dumps(user))
-        redis.expire(str(username), 3600)
-    else:
-        user = pickle.loads(user)
+async def ensure_not_revoked(payload: dict, redis) -> None:
+    jti = payload.get("jti")
+    if jti is not None and await revocation_list.is_revoked(redis, jti):
+        raise credentials_exception
+
+async def revoke_access_token(token: str, redis) -> None:
+    """Revoke access token before its expiration
+
+    Args:
+        token (str): Access token
+        redis: Redis client
+    """
+    try:
+        payload = decode_access_token(token)
+    except HTTPException:
+        # Invalid or expired token cannot be used anyway
+        return
+    if "jti" in payload:
+        await revocation_list.revoke(redis, payload["jti"], payload["exp"])
+
+def claims_from_payload(payload: dict) -> TokenClaims | None:
+    """Build claims from token payload, None for tokens issued without them"""
+    try:
+        return TokenClaims(
+            id=payload["uid"],
+            username=payload["sub"],
+            role=payload["role"],
+            token_version=payload["ver"],
+        )
+    except (KeyError, ValidationError):
+        return None
 
-    # user_service = UserService(db)
-    # user = await user_service.get_user_by_username(username)
-    # if user is None:
-    #     raise credentials_exception
+async def resolve_user(payload: dict, db: Session, redis) -> UserSnapshot:
+    username = str(payload["sub"])
+
+    async def refresh_user():
+        async with sessionmanager.session() as session:
+            return await load_user_snapshot(session, username)
+
+    loader = lambda: load_user_snapshot(db, username)
+    user = await get_user(redis, username, loader=loader, background_loader=refresh_user)
+    # Tokens issued before versioning count as version 0, revoked by the first bump
+    version = payload.get("ver", 0)
+    if user is not None and version != user.token_version:
+        # Cached user may be older than the token, recheck against DB
+        user = await fetch_user(redis, username, loader)
+        if user is not None and version != user.token_version:
+            raise credentials_exception
+    if user is None:
+        raise credentials_exception
     return user
 
-def get_current_moderator_user(current_user: User = Depends(get_current_user)):
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db), redis = Depends (get_redis)
+):
+    payload = decode_access_token(token)
+    await ensure_not_revoked(payload, redis)
+    return await resolve_user(payload, db, redis)
+
+async def get_current_claims(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db), redis = Depends(get_redis)
+) -> TokenClaims:
+    """Authorize from signed token claims, loading the user only when needed
+
+    Claims are trusted while their version matches the cached per-user
+    token version. Tokens without claims or with another version fall
+    back to the full user load.
+
+    Args:
+        token (str, optional): Access token. Defaults to Depends(oauth2_scheme).
+        db (Session, optional): db connection. Defaults to Depends(get_db).
+        redis (optional): Redis client. Defaults to Depends(get_redis).
+
+    Raises:
+        HTTPException: HTTP_401_UNAUTHORIZED
+
+    Returns:
+        TokenClaims
+    """
+    payload = decode_access_token(token)
+    await ensure_not_revoked(payload, redis)
+    claims = claims_from_payload(payload)
+    if claims is not None:
+        version = await get_token_version(
+            redis, claims.id, loader=lambda: UserService(db).get_token_version(claims.id)
+        )
+        if version == claims.token_version:
+            return claims
+
+    user = await resolve_user(payload, db, redis)
+    return TokenClaims(
+        id=user.id,
+        username=user.username,
+        role=user.role,
+        token_version=user.token_version,
+    )
+
+def get_current_moderator_user(current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role not in [UserRole.MODERATOR, UserRole.ADMIN]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостатньо прав доступу")
     return current_user
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
+def get_current_admin_user(current_user: TokenClaims = Depends(get_current_claims)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостатньо прав доступу")
     return current_user
 
-async def verify_refresh_token(refresh_token: str, db: Session):
+def decode_refresh_token(refresh_token: str) -> dict | None:
     try:
         payload = jwt.decode(
             refresh_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
-        username = payload["sub"]
-        token_type: str = payload["token_type"]
-        if username is None or token_type != "refresh":
-            return None
-        user_service = UserService(db)
-        user = await user_service.get_user_by_refresh_token(username, refresh_token)
-        return user
     except JWTError:
         return None
+    if (
+        payload.get("sub") is None
+        or payload.get("token_type") != "refresh"
+        or "jti" not in payload
+        or "uid" not in payload
+    ):
+        return None
+    return payload
+
+async def issue_refresh_token(user, redis) -> str:
+    """Open new session and create its refresh token
+
+    Args:
+        user: User or UserSnapshot
+        redis: Redis client
+
+    Returns:
+        Encoded refresh JWT with sub, uid and jti claims
+    """
+    jti = await RefreshTokenService(redis).create(user.id)
+    return await create_refresh_token(
+        data={"sub": user.username, "uid": user.id, "jti": jti}
+    )
+
+async def rotate_refresh_token(
+    refresh_token: str, db: Session, redis
+) -> tuple[UserSnapshot, str] | None:
+    """Exchange refresh token for a new one
+
+    Reuse of an already rotated or revoked token revokes all sessions of
+    the user.
+
+    Args:
+        refresh_token (str): Current refresh token
+        db (Session): db connection
+        redis: Redis client
+
+    Returns:
+        Tuple of user and new refresh token, None if token is invalid
+    """
+    payload = decode_refresh_token(refresh_token)
+    if payload is None:
+        return None
+    refresh_token_service = RefreshTokenService(redis)
+    if not await refresh_token_service.consume(payload["jti"], payload["uid"]):
+        await refresh_token_service.revoke_all(payload["uid"])
+        return None
+
+    username = str(payload["sub"])
+    user = await get_user(redis, username, loader=lambda: load_user_snapshot(db, username))
+    if user is None:
+        return None
+    return user, await issue_refresh_token(user, redis)
+
+async def revoke_refresh_token(refresh_token: str, redis) -> bool:
+    """Close session of refresh token
+
+    Args:
+        refresh_token (str): Refresh token
+        redis: Redis client
+
+    Returns:
+        False if token is invalid
+    """
+    payload = decode_refresh_token(refresh_token)
+    if payload is None:
+        return False
+    await RefreshTokenService(redis).revoke(payload["uid"], payload["jti"])
+    return True
 
-async def change_user_password(change_password: ChangePassword, db: Session):
+async def change_user_password(change_password: ChangePassword, db: Session, redis):
     try:
         payload = jwt.decode(
             change_password.reset_password_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
@@ -153,9 +355,16 @@ async def change_user_password(change_password: ChangePassword, db: Session):
                 detail="Пароль повинен бути не менше 8 символів",
             )
 
-        user.hashed_password = Hash().get_password_hash(change_password.new_password)
+        user.hashed_password = await hashing_service.get_password_hash(change_password.new_password)
         user.password_reset_token = None
+        # Revoke access tokens issued with the old password
+        user.token_version += 1
+        # Attributes expire on commit, lazy loading them afterwards fails in async code
+        username, user_id = user.username, user.id
         await db.commit()
+        await invalidate_user(redis, username)
+        await invalidate_token_version(redis, user_id)
+        await RefreshTokenService(redis).revoke_all(user_id)
 
         return user
 
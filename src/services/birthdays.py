@@ -0,0 +1,222 @@
+import asyncio
+from calendar import isleap
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import AsyncContextManager, Callable
+
+from redis.exceptions import ConnectionError, TimeoutError
+from sqlalchemy import ColumnElement, select, true
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact, User, birthday_key
+
+# Contact ids of user scored by date ordinal of their next birthday
+BIRTHDAYS_KEY = "birthdays:{}"
+# Date ordinal the birthdays set of user was built for
+BIRTHDAYS_BUILT_KEY = "birthdays_built:{}"
+BIRTHDAYS_BUILD_LOCK = "birthdays_build_lock:{}"
+BIRTHDAYS_WINDOW_DAYS = 30
+BUILD_BATCH_USERS = 500
+BIRTHDAYS_TTL = (BIRTHDAYS_WINDOW_DAYS + 1) * 86400
+# Larger windows are paged by SQL instead of an id list
+BIRTHDAYS_MAX_IDS = 1000
+
+
+def birthday_window(today: date, days: int) -> ColumnElement:
+    """Condition for birthdays from today to today + days inclusive
+
+    Matches birthday_mmdd against month/day keys of every day in window
+    so any birth year matches and windows crossing new year stay one
+    index lookup. Birthdays on 29 February are celebrated on
+    28 February in non-leap years.
+
+    Args:
+        today (date): First day of window
+        days (int): Window length after today
+
+    Returns:
+        Where clause
+    """
+    if days >= 365:
+        return true()
+    keys = set()
+    for offset in range(days + 1):
+        day = today + timedelta(days=offset)
+        keys.add(birthday_key(day))
+        if day.month == 2 and day.day == 28 and not isleap(day.year):
+            keys.add(229)
+    return Contact.birthday_mmdd.in_(sorted(keys))
+
+
+def next_birthday(birthday_mmdd: int, today: date) -> date:
+    """Date of next birthday on or after today
+
+    Args:
+        birthday_mmdd (int): Birthday as MMDD number
+        today (date): Current date
+
+    Returns:
+        date, 29 February moves to 28 February in non-leap years
+    """
+    month, day = divmod(birthday_mmdd, 100)
+    for year in (today.year, today.year + 1):
+        if month == 2 and day == 29 and not isleap(year):
+            birthday = date(year, 2, 28)
+        else:
+            birthday = date(year, month, day)
+        if birthday >= today:
+            return birthday
+
+
+async def get_birthday_ids(redis, user_id: int, today: date, days: int) -> list[int] | None:
+    """Contact ids with birthday from today to today + days from materialized set
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+        today (date): Current date of user
+        days (int): Window length after today
+
+    Returns:
+        Up to BIRTHDAYS_MAX_IDS + 1 contact ids, None when set is missing or does not cover the window
+    """
+    built = await redis.get(BIRTHDAYS_BUILT_KEY.format(user_id))
+    if built is None:
+        return None
+    built_on = int(built)
+    if not built_on <= today.toordinal() <= today.toordinal() + days <= built_on + BIRTHDAYS_WINDOW_DAYS:
+        return None
+    ids = await redis.zrangebyscore(
+        BIRTHDAYS_KEY.format(user_id),
+        today.toordinal(),
+        today.toordinal() + days,
+        start=0,
+        num=BIRTHDAYS_MAX_IDS + 1,
+    )
+    return [int(contact_id) for contact_id in ids]
+
+
+async def update_birthdays(redis, user_id: int, contacts: list[tuple[int, int]]) -> None:
+    """Place created or updated contacts in materialized set of user if it exists
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+        contacts (list[tuple[int, int]]): Pairs of contact id and birthday as MMDD number
+    """
+    built = await redis.get(BIRTHDAYS_BUILT_KEY.format(user_id))
+    if built is None:
+        return
+    built_on = date.fromordinal(int(built))
+    window_end = built_on + timedelta(days=BIRTHDAYS_WINDOW_DAYS)
+    key = BIRTHDAYS_KEY.format(user_id)
+    async with redis.pipeline(transaction=False) as pipe:
+        for contact_id, birthday_mmdd in contacts:
+            birthday = next_birthday(birthday_mmdd, built_on)
+            if birthday <= window_end:
+                pipe.zadd(key, {contact_id: birthday.toordinal()})
+            else:
+                pipe.zrem(key, contact_id)
+        await pipe.execute()
+
+
+async def update_birthday(redis, user_id: int, contact_id: int, birthday_mmdd: int) -> None:
+    """Place created or updated contact in materialized set of user if it exists
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+        contact_id (int): Contact id
+        birthday_mmdd (int): Birthday as MMDD number
+    """
+    await update_birthdays(redis, user_id, [(contact_id, birthday_mmdd)])
+
+
+async def remove_birthdays(redis, user_id: int, contact_ids: list[int]) -> None:
+    """Drop removed contacts from materialized set of user
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+        contact_ids (list[int]): Contact ids
+    """
+    if contact_ids:
+        await redis.zrem(BIRTHDAYS_KEY.format(user_id), *contact_ids)
+
+
+async def remove_birthday(redis, user_id: int, contact_id: int) -> None:
+    """Drop removed contact from materialized set of user
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+        contact_id (int): Contact id
+    """
+    await remove_birthdays(redis, user_id, [contact_id])
+
+
+async def build_birthdays(redis, session: AsyncSession, today: date) -> int:
+    """Materialize next BIRTHDAYS_WINDOW_DAYS birthdays of every user
+
+    Sets of a batch of users are replaced in one transaction so readers
+    never see a partially built set.
+
+    Args:
+        redis: Redis client
+        session (AsyncSession): db session
+        today (date): First day of window
+
+    Returns:
+        Number of materialized contacts
+    """
+    birthdays = defaultdict(dict)
+    rows = await session.stream(
+        select(Contact.user_id, Contact.id, Contact.birthday_mmdd).where(
+            birthday_window(today, BIRTHDAYS_WINDOW_DAYS)
+        )
+    )
+    async for user_id, contact_id, birthday_mmdd in rows:
+        birthdays[user_id][contact_id] = next_birthday(birthday_mmdd, today).toordinal()
+
+    user_ids = (await session.execute(select(User.id))).scalars().all()
+    for start in range(0, len(user_ids), BUILD_BATCH_USERS):
+        async with redis.pipeline(transaction=True) as pipe:
+            for user_id in user_ids[start : start + BUILD_BATCH_USERS]:
+                key = BIRTHDAYS_KEY.format(user_id)
+                pipe.delete(key)
+                if birthdays.get(user_id):
+                    pipe.zadd(key, birthdays[user_id])
+                    pipe.expire(key, BIRTHDAYS_TTL)
+                pipe.set(BIRTHDAYS_BUILT_KEY.format(user_id), today.toordinal(), ex=BIRTHDAYS_TTL)
+            await pipe.execute()
+    return sum(len(contacts) for contacts in birthdays.values())
+
+
+async def materialize_birthdays(
+    redis, session_factory: Callable[[], AsyncContextManager[AsyncSession]]
+) -> None:
+    """Rebuild materialized birthdays once a day
+
+    Runs until cancelled. One worker per day takes the build lock, the
+    others keep serving sets it builds.
+
+    Args:
+        redis: Redis client
+        session_factory (Callable[[], AsyncContextManager[AsyncSession]]): db session factory
+    """
+    while True:
+        today = date.today()
+        lock = BIRTHDAYS_BUILD_LOCK.format(today.isoformat())
+        try:
+            if await redis.set(lock, 1, nx=True, ex=86400):
+                try:
+                    async with session_factory() as session:
+                        await build_birthdays(redis, session, today)
+                except SQLAlchemyError as e:
+                    await redis.delete(lock)
+                    print(e)
+        except (ConnectionError, TimeoutError):
+            pass
+        tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        await asyncio.sleep(max((tomorrow - datetime.now()).total_seconds(), 1))
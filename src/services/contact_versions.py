@@ -0,0 +1,127 @@
+import hashlib
+import uuid
+
+from fastapi import Request, Response
+from redis.exceptions import ConnectionError, TimeoutError
+
+# Opaque token of the current state of contacts of user, replaced by every write
+CONTACTS_VERSION_KEY = "contacts_version:{}"
+CONTACTS_VERSION_TTL = 30 * 86400
+
+
+async def get_contacts_version(redis, user_id: int) -> str | None:
+    """Get contacts version of user, starting a new one when it is missing
+
+    Versions are random so a version lost with its key is never reused.
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+
+    Returns:
+        Version token, None when Redis is unavailable and the version is unknown
+    """
+    key = CONTACTS_VERSION_KEY.format(user_id)
+    try:
+        version = await redis.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not await redis.set(key, version, ex=CONTACTS_VERSION_TTL, nx=True):
+                version = await redis.get(key)
+    except (ConnectionError, TimeoutError):
+        return None
+    return version.decode() if isinstance(version, bytes) else version
+
+
+async def bump_contacts_version(redis, user_id: int) -> None:
+    """Replace contacts version of user after a committed write
+
+    Args:
+        redis: Redis client
+        user_id (int): Contacts owner id
+    """
+    await redis.set(CONTACTS_VERSION_KEY.format(user_id), uuid.uuid4().hex, ex=CONTACTS_VERSION_TTL)
+
+
+def make_etag(version: str, request: Request) -> str:
+    """Strong ETag of response to request made at contacts version
+
+    Args:
+        version (str): Contacts version of user
+        request (Request): HTTP request
+
+    Returns:
+        Quoted entity tag
+    """
+    digest = hashlib.blake2b(
+        f"{version}|{request.url.path}?{request.url.query}".encode(), digest_size=12
+    )
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Weak comparison of If-None-Match header with ETag
+
+    Args:
+        header (str | None): If-None-Match header value
+        etag (str): Current ETag
+
+    Returns:
+        True when header lists etag or is *
+    """
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def contact_etag(version: int) -> str:
+    """Strong ETag of one contact at its row version
+
+    Args:
+        version (int): Contact version
+
+    Returns:
+        Quoted entity tag
+    """
+    return f'"{version}"'
+
+
+def parse_if_match(header: str | None) -> list[int] | None:
+    """Contact versions listed in If-Match header
+
+    Weak and foreign tags never match, as If-Match uses strong comparison.
+
+    Args:
+        header (str | None): If-Match header value
+
+    Returns:
+        Versions, None when header is missing or *
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
+
+def contacts_etag(version: str, request: Request, response: Response) -> Response | None:
+    """Set ETag of contacts read and check it against If-None-Match
+
+    Args:
+        version (str): Contacts version of user
+        request (Request): HTTP request
+        response (Response): HTTP response
+
+    Returns:
+        304 response when client copy is current, otherwise None
+    """
+    etag = make_etag(version, request)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,34 +1,124 @@
+from datetime import date
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repository.contacts import ContactRepository
-from src.schemas import ContactModel, ContactUpdate, ContactStatusUpdate
+from src.schemas import (
+    ContactBulkResult,
+    ContactModel,
+    ContactPatch,
+    ContactUpdate,
+    ContactStatusUpdate,
+    ContactOrder,
+)
 
 from src.database.models import User
+from src.services.prefix_index import contact_prefix_indexes
+
+
+def bulk_result(ids: list[int], affected: list[int]) -> ContactBulkResult:
+    affected = set(affected)
+    return ContactBulkResult(
+        affected=[contact_id for contact_id in ids if contact_id in affected],
+        not_found=[contact_id for contact_id in ids if contact_id not in affected],
+    )
+
 
 class ContactService:
-    def __init__(self, db: AsyncSession):
-        self.contact_repository = ContactRepository(db)
+    def __init__(self, db: AsyncSession, redis=None):
+        self.contact_repository = ContactRepository(db, redis)
 
     async def create_contact(self, body: ContactModel, user: User):
         return await self.contact_repository.create_contact(body, user)
 
-    async def get_contacts(self, skip: int, limit: int, user: User):
-        return await self.contact_repository.get_contacts(skip, limit, user)
+    async def create_contacts(self, bodies: list[ContactModel], user: User):
+        return await self.contact_repository.create_contacts(bodies, user)
+
+    async def get_contacts(
+        self,
+        skip: int,
+        limit: int,
+        user: User,
+        after: tuple | None = None,
+        order_by: ContactOrder = ContactOrder.id,
+        columns: list[str] | None = None,
+    ):
+        return await self.contact_repository.get_contacts(
+            skip, limit, user, after, order_by, columns
+        )
 
     async def get_contact(self, contact_id: int, user: User):
         return await self.contact_repository.get_contact_by_id(contact_id, user)
 
-    async def update_contact(self, contact_id: int, body: ContactUpdate, user: User):
-        return await self.contact_repository.update_contact(contact_id, body, user)
+    async def suggest_contacts(self, prefix: str, limit: int, user: User):
+        index = await contact_prefix_indexes.get(
+            user.id, lambda: self.contact_repository.get_suggest_items(user)
+        )
+        return index.search(prefix, limit)
+
+    async def get_contacts_by_ids(
+        self, ids: list[int], user: User, columns: list[str] | None = None
+    ):
+        return await self.contact_repository.get_contacts_by_ids(ids, user, columns)
+
+    async def update_contacts(self, ids: list[int], body: ContactPatch, user: User):
+        ids = sorted(set(ids))
+        affected = await self.contact_repository.update_contacts(ids, body, user)
+        return bulk_result(ids, affected)
+
+    async def remove_contacts(self, ids: list[int], user: User):
+        ids = sorted(set(ids))
+        affected = await self.contact_repository.remove_contacts(ids, user)
+        return bulk_result(ids, affected)
+
+    async def get_contact_version(self, contact_id: int, user: User):
+        return await self.contact_repository.get_contact_version(contact_id, user)
+
+    async def update_contact(
+        self, contact_id: int, body: ContactUpdate, user: User, versions: list[int] | None = None
+    ):
+        return await self.contact_repository.update_contact(contact_id, body, user, versions)
 
-    async def update_status_contact(self, contact_id: int, body: ContactStatusUpdate, user: User):
-        return await self.contact_repository.update_status_contact(contact_id, body, user)
+    async def update_status_contact(
+        self,
+        contact_id: int,
+        body: ContactStatusUpdate,
+        user: User,
+        versions: list[int] | None = None,
+    ):
+        return await self.contact_repository.update_status_contact(
+            contact_id, body, user, versions
+        )
 
     async def remove_contact(self, contact_id: int, user: User):
         return await self.contact_repository.remove_contact(contact_id, user)
 
-    async def search_contacts(self, search_field: str, query: str, skip: int, limit: int, user: User):
-        return await self.contact_repository.search_contacts(search_field, query, skip, limit, user)
+    async def search_contacts(
+        self,
+        search_field: str,
+        query: str,
+        skip: int,
+        limit: int,
+        user: User,
+        after: tuple | None = None,
+        order_by: ContactOrder = ContactOrder.id,
+        columns: list[str] | None = None,
+    ):
+        return await self.contact_repository.search_contacts(
+            search_field, query, skip, limit, user, after, order_by, columns
+        )
 
-    async def birthdays_contacts(self, skip: int, limit: int, user: User):
-        return await self.contact_repository.birthdays_contacts(skip, limit, user)
+    async def birthdays_contacts(
+        self,
+        skip: int,
+        limit: int,
+        user: User,
+        after: tuple | None = None,
+        order_by: ContactOrder = ContactOrder.id,
+        days: int = 7,
+        today: date | None = None,
+        columns: list[str] | None = None,
+    ):
+        return await self.contact_repository.birthdays_contacts(
+            skip, limit, user, after, order_by, days, today, columns
+        )
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import AsyncContextManager, AsyncIterator, Callable, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repository.contacts import ContactRepository
+from src.schemas import TokenClaims
+
+EXPORT_COLUMNS = (
+    "id",
+    "firstname",
+    "lastname",
+    "email",
+    "phone",
+    "birthday",
+    "description",
+    "done",
+    "created_at",
+    "updated_at",
+)
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _values(row: Row) -> list:
+    # birthday is stored as DateTime, exported as date like ContactResponse
+    values = list(row)
+    birthday = EXPORT_COLUMNS.index("birthday")
+    if isinstance(values[birthday], datetime):
+        values[birthday] = values[birthday].date()
+    return [value.isoformat() if isinstance(value, date) else value for value in values]
+
+
+def csv_chunk(rows: Sequence[Row], header: bool = False) -> str:
+    """Serialize rows as CSV lines
+
+    Args:
+        rows (Sequence[Row]): Rows with EXPORT_COLUMNS
+        header (bool, optional): Prepend header line. Defaults to False.
+
+    Returns:
+        str
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(_values(row) for row in rows)
+    return buffer.getvalue()
+
+
+def ndjson_chunk(rows: Sequence[Row]) -> str:
+    """Serialize rows as newline-delimited JSON objects
+
+    Args:
+        rows (Sequence[Row]): Rows with EXPORT_COLUMNS
+
+    Returns:
+        str
+    """
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _values(row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def export_contacts(
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+    user: TokenClaims,
+    export_format: ExportFormat,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[str]:
+    """Serialize all contacts of user chunk by chunk
+
+    Owns its session, streaming responses outlive request dependencies.
+
+    Args:
+        session_factory (Callable[[], AsyncContextManager[AsyncSession]]): db session factory
+        user (TokenClaims): Current user
+        export_format (ExportFormat): Output format
+        chunk_size (int, optional): Rows per chunk. Defaults to EXPORT_CHUNK_SIZE.
+
+    Yields:
+        Serialized chunks, CSV starts with header
+    """
+    if export_format == ExportFormat.csv:
+        yield csv_chunk([], header=True)
+    async with session_factory() as session:
+        repository = ContactRepository(session)
+        async for rows in repository.stream_contacts(user, EXPORT_COLUMNS, chunk_size):
+            if export_format == ExportFormat.csv:
+                yield csv_chunk(rows)
+            else:
+                yield ndjson_chunk(rows)
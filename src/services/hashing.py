@@ -0,0 +1,134 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from src.conf.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _timed(fn, *args):
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+class HashingService:
+    """Run bcrypt on a bounded worker pool outside the event loop"""
+
+    def __init__(self, max_workers: int, max_queue: int, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервер перевантажений. Спробуйте пізніше.",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        submitted = time.monotonic()
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _timed, fn, *args
+            )
+        finally:
+            self._pending -= 1
+
+        queue_wait = started - submitted
+        hash_time = finished - started
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+        return result
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password against bcrypt hash
+
+        Args:
+            plain_password (str): Password from user
+            hashed_password (str): Stored hash
+
+        Raises:
+            HTTPException: HTTP_503_SERVICE_UNAVAILABLE when queue is full
+
+        Returns:
+            bool
+        """
+        return await self._run(_verify, plain_password, hashed_password)
+
+    async def get_password_hash(self, password: str) -> str:
+        """Hash password with bcrypt
+
+        Args:
+            password (str): Plain password
+
+        Raises:
+            HTTPException: HTTP_503_SERVICE_UNAVAILABLE when queue is full
+
+        Returns:
+            Password hash
+        """
+        return await self._run(_hash, password)
+
+    def stats(self) -> dict:
+        """Pool counters and timings in seconds
+
+        Returns:
+            Dict with pending, completed and rejected counts, queue wait and hash time
+        """
+        completed = self.completed or 1
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_avg": self.queue_wait_total / completed,
+            "queue_wait_max": self.queue_wait_max,
+            "hash_time_avg": self.hash_time_total / completed,
+            "hash_time_max": self.hash_time_max,
+        }
+
+hashing_service = HashingService(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
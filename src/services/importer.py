@@ -0,0 +1,243 @@
+import csv
+import io
+import os
+import re
+import uuid
+from enum import Enum
+from typing import AsyncContextManager, BinaryIO, Callable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactModel, ImportJob, ImportRowError, ImportStatus, TokenClaims
+
+IMPORT_JOB_KEY = "import_job:{}:{}"
+IMPORT_JOB_TTL = 24 * 3600
+IMPORT_FIELDS = ("firstname", "lastname", "email", "phone", "birthday", "description")
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    vcard = "vcard"
+
+
+def detect_format(filename: str | None) -> ImportFormat:
+    """Guess import format from uploaded file name, CSV by default"""
+    if filename and filename.lower().endswith((".vcf", ".vcard")):
+        return ImportFormat.vcard
+    return ImportFormat.csv
+
+
+def _contact_data(values: dict) -> dict:
+    data = {field: values[field] for field in IMPORT_FIELDS if values.get(field) is not None}
+    data.setdefault("description", "")
+    return data
+
+
+def parse_csv(file: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """Read contacts from CSV with header row, one row at a time
+
+    Columns are matched to contact fields by name, unknown columns are ignored.
+
+    Args:
+        file (BinaryIO): Uploaded file
+
+    Yields:
+        Row number and contact data
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [column.strip().lower() for column in next(reader, [])]
+    for number, row in enumerate(reader, start=1):
+        if not any(value.strip() for value in row):
+            continue
+        yield number, _contact_data(
+            {column: value.strip() for column, value in zip(header, row)}
+        )
+
+
+_VCARD_ESCAPES = re.compile(r"\\([\\,;nN])")
+
+
+def _vcard_value(value: str) -> str:
+    return _VCARD_ESCAPES.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _vcard_lines(file: BinaryIO) -> Iterator[str]:
+    # Folded lines continue with leading whitespace
+    current = None
+    for raw in io.TextIOWrapper(file, encoding="utf-8-sig", newline=""):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _vcard_contact(properties: dict) -> dict:
+    values = {}
+    if "N" in properties:
+        parts = properties["N"].split(";")
+        values["lastname"] = _vcard_value(parts[0]).strip()
+        values["firstname"] = _vcard_value(parts[1]).strip() if len(parts) > 1 else ""
+    elif "FN" in properties:
+        firstname, _, lastname = _vcard_value(properties["FN"]).strip().partition(" ")
+        values["firstname"], values["lastname"] = firstname, lastname
+    if "EMAIL" in properties:
+        values["email"] = _vcard_value(properties["EMAIL"]).strip()
+    if "TEL" in properties:
+        values["phone"] = _vcard_value(properties["TEL"]).strip()
+    if "BDAY" in properties:
+        birthday = properties["BDAY"].strip()
+        if re.fullmatch(r"\d{8}", birthday):
+            birthday = f"{birthday[:4]}-{birthday[4:6]}-{birthday[6:]}"
+        values["birthday"] = birthday
+    if "NOTE" in properties:
+        values["description"] = _vcard_value(properties["NOTE"])
+    return _contact_data(values)
+
+
+def parse_vcard(file: BinaryIO) -> Iterator[tuple[int, dict]]:
+    """Read contacts from vCard file, one card at a time
+
+    Uses N (or FN), first EMAIL, TEL, BDAY and NOTE of each card.
+
+    Args:
+        file (BinaryIO): Uploaded file
+
+    Yields:
+        Card number and contact data
+    """
+    number = 0
+    properties = None
+    for line in _vcard_lines(file):
+        name, _, value = line.partition(":")
+        # Drop group prefix and parameters, e.g. item1.EMAIL;TYPE=work
+        name = name.split(";")[0].split(".")[-1].upper()
+        if name == "BEGIN" and value.upper() == "VCARD":
+            properties = {}
+        elif name == "END" and value.upper() == "VCARD" and properties is not None:
+            number += 1
+            yield number, _vcard_contact(properties)
+            properties = None
+        elif properties is not None:
+            properties.setdefault(name, value)
+
+
+PARSERS = {ImportFormat.csv: parse_csv, ImportFormat.vcard: parse_vcard}
+
+
+def row_errors(row: int, error: ValidationError) -> ImportRowError:
+    return ImportRowError(
+        row=row,
+        errors=[
+            f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+            for item in error.errors()
+        ],
+    )
+
+
+async def save_job(redis, user_id: int, job: ImportJob) -> None:
+    await redis.set(IMPORT_JOB_KEY.format(user_id, job.id), job.model_dump_json(), ex=IMPORT_JOB_TTL)
+
+
+async def create_job(redis, user_id: int) -> ImportJob:
+    """Register pending import of user
+
+    Args:
+        redis: Redis client
+        user_id (int): Importing user id
+
+    Returns:
+        ImportJob
+    """
+    job = ImportJob(id=uuid.uuid4().hex)
+    await save_job(redis, user_id, job)
+    return job
+
+
+async def get_job(redis, user_id: int, job_id: str) -> ImportJob | None:
+    """Get import of user by id
+
+    Args:
+        redis: Redis client
+        user_id (int): Importing user id
+        job_id (str): Import id
+
+    Returns:
+        ImportJob | None
+    """
+    data = await redis.get(IMPORT_JOB_KEY.format(user_id, job_id))
+    return ImportJob.model_validate_json(data) if data is not None else None
+
+
+async def run_import(
+    redis,
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+    user: TokenClaims,
+    path: str,
+    import_format: ImportFormat,
+    job: ImportJob,
+    batch_size: int = settings.CONTACTS_IMPORT_BATCH_SIZE,
+    max_errors: int = settings.CONTACTS_IMPORT_MAX_ERRORS,
+) -> ImportJob:
+    """Validate and insert contacts from file in batches, reporting progress to Redis
+
+    Every batch is committed on its own, rows of batches written before
+    a failure stay imported. The file is removed when done.
+
+    Args:
+        redis: Redis client
+        session_factory (Callable[[], AsyncContextManager[AsyncSession]]): db session factory
+        user (TokenClaims): Importing user
+        path (str): Path of uploaded file
+        import_format (ImportFormat): File format
+        job (ImportJob): Registered job
+        batch_size (int, optional): Contacts per INSERT. Defaults to settings.CONTACTS_IMPORT_BATCH_SIZE.
+        max_errors (int, optional): Rejected rows reported in detail. Defaults to settings.CONTACTS_IMPORT_MAX_ERRORS.
+
+    Returns:
+        Finished ImportJob
+    """
+    job.status = ImportStatus.running
+    await save_job(redis, user.id, job)
+    try:
+        async with session_factory() as session:
+            repository = ContactRepository(session, redis)
+            batch = []
+
+            async def flush():
+                await repository.create_contacts(batch, user)
+                job.accepted += len(batch)
+                batch.clear()
+                await save_job(redis, user.id, job)
+
+            with open(path, "rb") as file:
+                for row, data in PARSERS[import_format](file):
+                    job.processed += 1
+                    try:
+                        batch.append(ContactModel.model_validate(data))
+                    except ValidationError as e:
+                        job.rejected += 1
+                        if len(job.errors) < max_errors:
+                            job.errors.append(row_errors(row, e))
+                    if len(batch) >= batch_size:
+                        await flush()
+                if batch:
+                    await flush()
+        job.status = ImportStatus.done
+    except Exception as e:
+        # Any error has to finish the job, otherwise it is reported running forever
+        print(e)
+        job.status = ImportStatus.failed
+        job.detail = str(e)
+    finally:
+        os.remove(path)
+        await save_job(redis, user.id, job)
+    return job
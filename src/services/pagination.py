@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import datetime
+
+from src.schemas import ContactOrder
+
+def encode_cursor(order_by: ContactOrder, contact) -> str:
+    """Opaque cursor pointing after given contact
+
+    Args:
+        order_by (ContactOrder): Sort key of the page
+        contact: Last contact of the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    key = getattr(contact, order_by.value)
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    data = json.dumps([order_by.value, key, contact.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, order_by: ContactOrder) -> tuple:
+    """Decode cursor into last sort key and id
+
+    Args:
+        cursor (str): Cursor from previous page
+        order_by (ContactOrder): Sort key of requested page
+
+    Raises:
+        ValueError: Cursor is malformed or was issued for another sort key
+
+    Returns:
+        Tuple of last sort key and last id
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order, key, last_id = json.loads(data)
+        if order_by == ContactOrder.updated_at:
+            key = datetime.fromisoformat(key)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if order != order_by.value or not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    if order_by == ContactOrder.lastname and not isinstance(key, str):
+        raise ValueError("Invalid cursor")
+    return key, last_id
@@ -0,0 +1,168 @@
+from bisect import bisect_left, insort
+from typing import Awaitable, Callable, Iterable, NamedTuple
+
+from src.conf.config import settings
+from src.services.cache import LRUCache, SingleFlight
+
+
+class SuggestItem(NamedTuple):
+    id: int
+    firstname: str
+    lastname: str
+    email: str
+
+
+def item_terms(item: SuggestItem) -> set[str]:
+    """Lowercased terms a contact can be found by
+
+    Args:
+        item (SuggestItem): Indexed contact
+
+    Returns:
+        First name, last name, full name and email
+    """
+    return {
+        item.firstname.lower(),
+        item.lastname.lower(),
+        f"{item.firstname} {item.lastname}".lower(),
+        item.email.lower(),
+    }
+
+
+class PrefixIndex:
+    """Sorted array of (term, contact id) pairs answering prefix queries by bisection"""
+
+    def __init__(self, items: Iterable[SuggestItem] = ()):
+        self._items: dict[int, SuggestItem] = {item.id: item for item in items}
+        self._terms = sorted(
+            (term, item.id) for item in self._items.values() for term in item_terms(item)
+        )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: SuggestItem) -> None:
+        """Index contact, replacing previous version with the same id
+
+        Args:
+            item (SuggestItem): Contact to index
+        """
+        self.remove(item.id)
+        self._items[item.id] = item
+        for term in item_terms(item):
+            insort(self._terms, (term, item.id))
+
+    def remove(self, contact_id: int) -> None:
+        """Drop contact from index
+
+        Args:
+            contact_id (int): Contact id
+        """
+        item = self._items.pop(contact_id, None)
+        if item is None:
+            return
+        for term in item_terms(item):
+            position = bisect_left(self._terms, (term, contact_id))
+            if position < len(self._terms) and self._terms[position] == (term, contact_id):
+                del self._terms[position]
+
+    def search(self, prefix: str, limit: int) -> list[SuggestItem]:
+        """Contacts with a term starting with prefix, ordered by matching term
+
+        Args:
+            prefix (str): Case-insensitive prefix
+            limit (int): Maximum number of contacts
+
+        Returns:
+            List of contacts
+        """
+        prefix = prefix.lower()
+        found = {}
+        position = bisect_left(self._terms, (prefix,))
+        while position < len(self._terms) and len(found) < limit:
+            term, contact_id = self._terms[position]
+            if not term.startswith(prefix):
+                break
+            found.setdefault(contact_id, self._items[contact_id])
+            position += 1
+        return list(found.values())
+
+
+class PrefixIndexCache:
+    """Lazily built prefix indexes of recently active users
+
+    Indexes are updated in place by writes of this worker and expire
+    after ttl to pick up writes made by other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.indexes = LRUCache(maxsize, ttl)
+        self.builds = SingleFlight()
+        # Users written to while their index was being loaded
+        self._stale: set[int] = set()
+
+    async def get(
+        self, user_id: int, loader: Callable[[], Awaitable[list[SuggestItem]]]
+    ) -> PrefixIndex:
+        """Get index of user, building it from loader on miss
+
+        Args:
+            user_id (int): Contacts owner id
+            loader (Callable[[], Awaitable[list[SuggestItem]]]): DB loader of all contacts of user
+
+        Returns:
+            PrefixIndex
+        """
+        index = self.indexes.get(user_id)
+        if index is not None:
+            return index
+
+        async def build():
+            index = PrefixIndex(await loader())
+            # Loaded rows can predate a concurrent write, serve them once but do not cache
+            if user_id not in self._stale:
+                self.indexes.set(user_id, index)
+            self._stale.discard(user_id)
+            return index
+
+        return await self.builds.do(user_id, build)
+
+    def _cached(self, user_id: int) -> PrefixIndex | None:
+        if user_id in self.builds:
+            self._stale.add(user_id)
+        return self.indexes.get(user_id)
+
+    def add(self, user_id: int, contact) -> None:
+        """Index created or updated contact if index of user is loaded
+
+        Args:
+            user_id (int): Contacts owner id
+            contact: Contact with id, firstname, lastname and email
+        """
+        index = self._cached(user_id)
+        if index is not None:
+            index.add(
+                SuggestItem(contact.id, contact.firstname, contact.lastname, contact.email)
+            )
+
+    def remove(self, user_id: int, contact_id: int) -> None:
+        """Drop removed contact if index of user is loaded
+
+        Args:
+            user_id (int): Contacts owner id
+            contact_id (int): Contact id
+        """
+        index = self._cached(user_id)
+        if index is not None:
+            index.remove(contact_id)
+
+    def clear(self) -> None:
+        self.indexes.clear()
+
+    def stats(self) -> dict:
+        return self.indexes.stats()
+
+
+contact_prefix_indexes = PrefixIndexCache(
+    maxsize=settings.SUGGEST_INDEX_USERS, ttl=settings.SUGGEST_INDEX_TTL
+)
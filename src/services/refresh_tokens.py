@@ -0,0 +1,87 @@
+import uuid
+
+from src.conf.config import settings
+
+REFRESH_TOKEN_KEY = "refresh_token:{}"
+USER_SESSIONS_KEY = "sessions:{}"
+
+class RefreshTokenService:
+    """Refresh token sessions in Redis
+
+    Every refresh token has a jti key holding the owner id with its own
+    TTL, and every user has a set of active jtis.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.ttl = settings.REFRESH_TOKEN_EXPIRATION_MINUTES * 60
+
+    async def create(self, user_id: int) -> str:
+        """Open new session
+
+        Args:
+            user_id (int): Session owner id
+
+        Returns:
+            jti of new refresh token
+        """
+        jti = uuid.uuid4().hex
+        sessions_key = USER_SESSIONS_KEY.format(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(REFRESH_TOKEN_KEY.format(jti), user_id, ex=self.ttl)
+            pipe.sadd(sessions_key, jti)
+            pipe.expire(sessions_key, self.ttl)
+            await pipe.execute()
+        return jti
+
+    async def consume(self, jti: str, user_id: int) -> bool:
+        """Atomically take refresh token for rotation
+
+        Args:
+            jti (str): Refresh token id
+            user_id (int): Expected owner id
+
+        Returns:
+            True if token was active and belonged to user
+        """
+        owner = await self.redis.getdel(REFRESH_TOKEN_KEY.format(jti))
+        await self.redis.srem(USER_SESSIONS_KEY.format(user_id), jti)
+        return owner is not None and int(owner) == user_id
+
+    async def list_sessions(self, user_id: int) -> list[str]:
+        """Active session ids of user
+
+        Args:
+            user_id (int): User id
+
+        Returns:
+            List of jti
+        """
+        jtis = [jti.decode() for jti in await self.redis.smembers(USER_SESSIONS_KEY.format(user_id))]
+        if not jtis:
+            return []
+        owners = await self.redis.mget([REFRESH_TOKEN_KEY.format(jti) for jti in jtis])
+        return [jti for jti, owner in zip(jtis, owners) if owner is not None]
+
+    async def revoke(self, user_id: int, jti: str) -> None:
+        """Close one session
+
+        Args:
+            user_id (int): Session owner id
+            jti (str): Refresh token id
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(REFRESH_TOKEN_KEY.format(jti))
+            pipe.srem(USER_SESSIONS_KEY.format(user_id), jti)
+            await pipe.execute()
+
+    async def revoke_all(self, user_id: int) -> None:
+        """Close all sessions of user
+
+        Args:
+            user_id (int): User id
+        """
+        sessions_key = USER_SESSIONS_KEY.format(user_id)
+        jtis = await self.redis.smembers(sessions_key)
+        keys = [REFRESH_TOKEN_KEY.format(jti.decode()) for jti in jtis]
+        await self.redis.delete(sessions_key, *keys)
@@ -0,0 +1,170 @@
+import hashlib
+import json
+from enum import Enum
+from typing import NamedTuple
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from src.conf.config import settings
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict[str, str]
+
+
+def encode_response(entry: CachedResponse) -> bytes:
+    """Serialize cached response for Redis
+
+    Args:
+        entry (CachedResponse): JSON body and headers
+
+    Returns:
+        Headers as JSON line followed by body
+    """
+    return json.dumps(entry.headers, separators=(",", ":")).encode() + b"\n" + entry.body
+
+
+def decode_response(data: bytes | None) -> CachedResponse | None:
+    """Deserialize cached response from Redis
+
+    Args:
+        data (bytes | None): Raw cached value
+
+    Returns:
+        CachedResponse or None when value is missing or corrupted
+    """
+    if not data:
+        return None
+    headers, newline, body = data.partition(b"\n")
+    if not newline:
+        return None
+    try:
+        return CachedResponse(body, json.loads(headers))
+    except ValueError:
+        return None
+
+
+def normalize_params(params: dict) -> str:
+    """Stable representation of request parameters
+
+    Missing parameters are dropped and the rest sorted by name, so equal
+    requests share one entry whatever the order or spelling of defaults.
+
+    Args:
+        params (dict): Parameter values
+
+    Returns:
+        Canonical string
+    """
+    values = {
+        name: value.value if isinstance(value, Enum) else value
+        for name, value in params.items()
+        if value is not None
+    }
+    return json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResponseCache:
+    """Serialized responses in Redis keyed by per-user contacts version
+
+    Writes replace the version so entries of older versions are never
+    read again and expire after ttl, no keys are scanned or deleted.
+    """
+
+    def __init__(self, prefix: str, ttl: int, max_bytes: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.oversized = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def key(self, user_id: int, version: str, endpoint: str, params: dict) -> str:
+        """Cache key of response
+
+        Args:
+            user_id (int): Contacts owner id
+            version (str): Contacts version of user
+            endpoint (str): Endpoint name
+            params (dict): Parameters the response depends on
+
+        Returns:
+            Redis key
+        """
+        digest = hashlib.blake2b(normalize_params(params).encode(), digest_size=16).hexdigest()
+        return f"{self.prefix}:{user_id}:{version}:{endpoint}:{digest}"
+
+    async def get(self, redis, key: str) -> CachedResponse | None:
+        """Get cached response, unavailable Redis counts as miss
+
+        Args:
+            redis: Redis client
+            key (str): Cache key
+
+        Returns:
+            CachedResponse | None
+        """
+        if not self.enabled:
+            return None
+        try:
+            entry = decode_response(await redis.get(key))
+        except (ConnectionError, TimeoutError):
+            self.errors += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def set(self, redis, key: str, entry: CachedResponse) -> None:
+        """Store response unless it is larger than max_bytes
+
+        Args:
+            redis: Redis client
+            key (str): Cache key
+            entry (CachedResponse): JSON body and headers
+        """
+        if not self.enabled:
+            return
+        data = encode_response(entry)
+        if len(data) > self.max_bytes:
+            self.oversized += 1
+            return
+        try:
+            await redis.set(key, data, ex=self.ttl)
+            self.stores += 1
+        except (ConnectionError, TimeoutError):
+            self.errors += 1
+
+    def stats(self) -> dict:
+        """Cache counters for sizing
+
+        Returns:
+            Dict with settings, hit, miss, store, oversized and error counters and hit ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "oversized": self.oversized,
+            "errors": self.errors,
+        }
+
+
+contact_responses = ResponseCache(
+    "contacts_response",
+    ttl=settings.RESPONSE_CACHE_TTL,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from src.conf.config import settings
+from src.services.bloom import BloomFilter
+
+REVOKED_TOKEN_KEY = "revoked_token:{}"
+# Stream of revoked access token jti used for filter sync. Entry ids are
+# assigned by Redis, so they grow monotonically whatever the worker clocks.
+REVOKED_TOKENS_LOG = "revoked_tokens:log"
+
+
+class RevocationList:
+    """Denylist of access token jti in Redis mirrored to an in-process Bloom filter
+
+    Redis is queried only for tokens the filter reports as possibly revoked.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        # Id of the last log entry added to the filter
+        self.last_id = "0-0"
+        # jti revoked by this worker while a new filter is being filled
+        self._rebuild_revoked: set[str] | None = None
+        self.checks = 0
+        self.maybe_revoked = 0
+        self.revoked = 0
+
+    async def revoke(self, redis, jti: str, expires_at: float) -> None:
+        """Revoke access token until its expiration
+
+        Args:
+            redis: Redis client
+            jti (str): Access token id
+            expires_at (float): Token exp as unix time
+        """
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        self.bloom.add(jti)
+        if self._rebuild_revoked is not None:
+            self._rebuild_revoked.add(jti)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(REVOKED_TOKEN_KEY.format(jti), 1, ex=ttl)
+            pipe.xadd(REVOKED_TOKENS_LOG, {"jti": jti})
+            await pipe.execute()
+
+    async def is_revoked(self, redis, jti: str) -> bool:
+        """Check access token against denylist
+
+        Args:
+            redis: Redis client
+            jti (str): Access token id
+
+        Returns:
+            True if token was revoked
+        """
+        self.checks += 1
+        if jti not in self.bloom:
+            return False
+        self.maybe_revoked += 1
+        if await redis.exists(REVOKED_TOKEN_KEY.format(jti)):
+            self.revoked += 1
+            return True
+        return False
+
+    @staticmethod
+    async def read_log(redis, bloom: BloomFilter, last_id: str) -> str:
+        """Add log entries after last_id to filter
+
+        Args:
+            redis: Redis client
+            bloom (BloomFilter): Filter to fill
+            last_id (str): Id of the last entry already in filter
+
+        Returns:
+            Id of the last entry read
+        """
+        for _, entries in await redis.xread({REVOKED_TOKENS_LOG: last_id}):
+            for entry_id, fields in entries:
+                bloom.add(fields[b"jti"].decode())
+                last_id = entry_id.decode()
+        return last_id
+
+    async def sync(self, redis) -> None:
+        """Add jti revoked by other workers since last sync to the filter
+
+        Args:
+            redis: Redis client
+        """
+        self.last_id = await self.read_log(redis, self.bloom, self.last_id)
+
+    async def rebuild(self, redis) -> None:
+        """Rebuild filter from tokens that can still be unexpired
+
+        The new filter is filled aside and swapped in together with its
+        log position, lookups meanwhile keep using the current filter.
+
+        Args:
+            redis: Redis client
+        """
+        # Trim by Redis time, entry ids are milliseconds of the same clock
+        seconds, _ = await redis.time()
+        oldest = (seconds - settings.JWT_EXPIRATION_SECONDS) * 1000
+        await redis.xtrim(REVOKED_TOKENS_LOG, minid=f"{oldest}-0", approximate=False)
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        self._rebuild_revoked = set()
+        try:
+            last_id = await self.read_log(redis, bloom, "0-0")
+            # Local revocations whose log entries the read may have missed
+            for jti in self._rebuild_revoked:
+                bloom.add(jti)
+            self.bloom, self.last_id = bloom, last_id
+        finally:
+            self._rebuild_revoked = None
+
+    def stats(self) -> dict:
+        return {
+            **self.bloom.stats(),
+            "checks": self.checks,
+            "maybe_revoked": self.maybe_revoked,
+            "revoked": self.revoked,
+            "false_positives": self.maybe_revoked - self.revoked,
+        }
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
+
+async def sync_revocations(redis) -> None:
+    """Keep the revocation filter of this worker in sync with Redis
+
+    Runs until cancelled. The filter is rebuilt once per access token
+    lifetime to drop expired entries.
+
+    Args:
+        redis: Redis client
+    """
+    rebuilt_at = 0.0
+    while True:
+        try:
+            if time.monotonic() - rebuilt_at >= settings.JWT_EXPIRATION_SECONDS:
+                await revocation_list.rebuild(redis)
+                rebuilt_at = time.monotonic()
+            else:
+                await revocation_list.sync(redis)
+        except (ConnectionError, TimeoutError):
+            pass
+        await asyncio.sleep(settings.REVOCATION_SYNC_INTERVAL)
@@ -0,0 +1,258 @@
+import asyncio
+import math
+import random
+import struct
+import time
+from typing import Awaitable, Callable, NamedTuple
+
+from pydantic import ValidationError
+from redis.exceptions import ConnectionError, TimeoutError
+
+from src.conf.config import settings
+from src.schemas import UserSnapshot
+from src.services.cache import LRUCache, SingleFlight
+
+USER_CACHE_VERSION = 3
+USER_CACHE_TTL = 3600
+USER_INVALIDATION_CHANNEL = "users:invalidate"
+TOKEN_VERSION_KEY = "token_version:{}"
+
+# expires_at (unix time) and delta (seconds spent loading from DB)
+_HEADER = struct.Struct("<dd")
+
+class CachedUser(NamedTuple):
+    user: UserSnapshot
+    expires_at: float
+    delta: float
+
+user_l1_cache = LRUCache(
+    maxsize=settings.USER_CACHE_L1_SIZE, ttl=settings.USER_CACHE_L1_TTL
+)
+token_version_cache = LRUCache(
+    maxsize=settings.TOKEN_VERSION_CACHE_SIZE, ttl=settings.TOKEN_VERSION_CACHE_TTL
+)
+user_loads = SingleFlight()
+_background_refreshes: set[asyncio.Task] = set()
+
+def encode_user(entry: CachedUser) -> bytes:
+    """Serialize cached user for Redis
+
+    Args:
+        entry (CachedUser): User snapshot with expiration metadata
+
+    Returns:
+        Schema version byte, binary header and compact JSON
+    """
+    return (
+        bytes((USER_CACHE_VERSION,))
+        + _HEADER.pack(entry.expires_at, entry.delta)
+        + entry.user.model_dump_json().encode()
+    )
+
+def decode_user(data: bytes | None) -> CachedUser | None:
+    """Deserialize cached user from Redis
+
+    Args:
+        data (bytes | None): Raw cached value
+
+    Returns:
+        CachedUser or None when value is missing, has another schema version or is corrupted
+    """
+    if not data or data[0] != USER_CACHE_VERSION or len(data) <= 1 + _HEADER.size:
+        return None
+    expires_at, delta = _HEADER.unpack_from(data, 1)
+    try:
+        user = UserSnapshot.model_validate_json(data[1 + _HEADER.size:])
+    except ValidationError:
+        return None
+    return CachedUser(user, expires_at, delta)
+
+def should_refresh(entry: CachedUser, now: float | None = None) -> bool:
+    """Probabilistic early expiration (XFetch)
+
+    Keys that took longer to load and are closer to expiration are more
+    likely to be refreshed ahead of time.
+
+    Args:
+        entry (CachedUser): Cached user
+        now (float | None, optional): Current unix time. Defaults to time.time().
+
+    Returns:
+        True when the entry should be refreshed now
+    """
+    if now is None:
+        now = time.time()
+    gap = -entry.delta * settings.USER_CACHE_XFETCH_BETA * math.log(1.0 - random.random())
+    return now + gap >= entry.expires_at
+
+async def get_cached_user(redis, username: str) -> CachedUser | None:
+    """Get user from in-process cache, falling back to Redis
+
+    Args:
+        redis: Redis client
+        username (str): Username
+
+    Returns:
+        CachedUser | None
+    """
+    entry = user_l1_cache.get(username)
+    if entry is not None:
+        return entry
+    entry = decode_user(await redis.get(username))
+    if entry is not None:
+        user_l1_cache.set(username, entry)
+    return entry
+
+async def cache_user(redis, user: UserSnapshot, delta: float = 0.0) -> None:
+    """Store user in in-process cache and Redis
+
+    Args:
+        redis: Redis client
+        user (UserSnapshot): User snapshot
+        delta (float, optional): Seconds spent loading user. Defaults to 0.0.
+    """
+    entry = CachedUser(user, time.time() + USER_CACHE_TTL, delta)
+    user_l1_cache.set(user.username, entry)
+    token_version_cache.set(user.id, user.token_version)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set(user.username, encode_user(entry), ex=USER_CACHE_TTL)
+        pipe.set(TOKEN_VERSION_KEY.format(user.id), user.token_version, ex=USER_CACHE_TTL)
+        await pipe.execute()
+
+async def fetch_user(
+    redis, username: str, loader: Callable[[], Awaitable[UserSnapshot | None]]
+) -> UserSnapshot | None:
+    """Load user from DB and cache it, one load per username at a time
+
+    Args:
+        redis: Redis client
+        username (str): Username
+        loader (Callable[[], Awaitable[UserSnapshot | None]]): DB loader
+
+    Returns:
+        UserSnapshot | None
+    """
+    async def load():
+        started = time.monotonic()
+        user = await loader()
+        if user is not None:
+            await cache_user(redis, user, time.monotonic() - started)
+        return user
+
+    return await user_loads.do(username, load)
+
+async def _refresh_user(redis, username: str, loader) -> None:
+    try:
+        await fetch_user(redis, username, loader)
+    except Exception as e:
+        print(e)
+
+async def get_user(
+    redis,
+    username: str,
+    loader: Callable[[], Awaitable[UserSnapshot | None]],
+    background_loader: Callable[[], Awaitable[UserSnapshot | None]] | None = None,
+) -> UserSnapshot | None:
+    """Get user from cache, loading it on miss
+
+    Hot entries close to expiration are refreshed in background with
+    background_loader while the cached value is returned.
+
+    Args:
+        redis: Redis client
+        username (str): Username
+        loader (Callable[[], Awaitable[UserSnapshot | None]]): DB loader for cache miss
+        background_loader (Callable[[], Awaitable[UserSnapshot | None]] | None, optional): DB loader for early refresh,
+            must not depend on request scope. Defaults to None.
+
+    Returns:
+        UserSnapshot | None
+    """
+    entry = await get_cached_user(redis, username)
+    if entry is None:
+        return await fetch_user(redis, username, loader)
+    if background_loader is not None and username not in user_loads and should_refresh(entry):
+        task = asyncio.create_task(_refresh_user(redis, username, background_loader))
+        _background_refreshes.add(task)
+        task.add_done_callback(_background_refreshes.discard)
+    return entry.user
+
+async def get_token_version(
+    redis, user_id: int, loader: Callable[[], Awaitable[int | None]]
+) -> int | None:
+    """Get per-user access token version from in-process cache, Redis or DB
+
+    Args:
+        redis: Redis client
+        user_id (int): User id
+        loader (Callable[[], Awaitable[int | None]]): DB loader for cache miss
+
+    Returns:
+        Token version or None when user does not exist
+    """
+    version = token_version_cache.get(user_id)
+    if version is not None:
+        return version
+    version = await redis.get(TOKEN_VERSION_KEY.format(user_id))
+    if version is not None:
+        version = int(version)
+    else:
+        version = await loader()
+        if version is None:
+            return None
+        await redis.set(TOKEN_VERSION_KEY.format(user_id), version, ex=USER_CACHE_TTL)
+    token_version_cache.set(user_id, version)
+    return version
+
+async def invalidate_user(redis, username: str) -> None:
+    """Drop cached user everywhere and notify other workers
+
+    Args:
+        redis: Redis client
+        username (str): Username
+    """
+    user_l1_cache.delete(username)
+    await redis.delete(username)
+    await redis.publish(USER_INVALIDATION_CHANNEL, f"u:{username}")
+
+async def invalidate_token_version(redis, user_id: int) -> None:
+    """Drop cached token version everywhere and notify other workers
+
+    Args:
+        redis: Redis client
+        user_id (int): User id
+    """
+    token_version_cache.delete(user_id)
+    await redis.delete(TOKEN_VERSION_KEY.format(user_id))
+    await redis.publish(USER_INVALIDATION_CHANNEL, f"v:{user_id}")
+
+def _evict(message: str) -> None:
+    kind, _, key = message.partition(":")
+    if kind == "u":
+        user_l1_cache.delete(key)
+    elif kind == "v":
+        token_version_cache.delete(int(key))
+
+async def listen_user_invalidations(redis) -> None:
+    """Evict users and token versions from in-process caches on messages from other workers
+
+    Runs until cancelled. The caches are cleared after a lost subscription
+    because invalidations published meanwhile are not redelivered.
+
+    Args:
+        redis: Redis client
+    """
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    _evict(message["data"].decode())
+        except (ConnectionError, TimeoutError):
+            user_l1_cache.clear()
+            token_version_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
@@ -5,8 +5,8 @@ from src.repository.users import UserRepository
 from src.schemas import UserCreate
 
 class UserService:
-    def __init__(self, db: AsyncSession):
-        self.repository = UserRepository(db)
+    def __init__(self, db: AsyncSession, redis=None):
+        self.repository = UserRepository(db, redis)
 
     async def create_user(self, body: UserCreate):
         avatar = None
@@ -22,12 +22,12 @@ class UserService:
     async def get_user_by_id(self, user_id: int):
         return await self.repository.get_user_by_id(user_id)
 
+    async def get_token_version(self, user_id: int):
+        return await self.repository.get_token_version(user_id)
+
     async def get_user_by_username(self, username: str):
         return await self.repository.get_user_by_username(username)
 
-    async def get_user_by_refresh_token(self, username: str, refresh_token: str):
-        return await self.repository.get_user_by_refresh_token(username, refresh_token)
-
     async def get_user_by_email(self, email: str):
         return await self.repository.get_user_by_email(email)
 
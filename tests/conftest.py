@@ -8,10 +8,12 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 
 from main import app
 from src.database.models import Base, User
-from src.database.db import get_db
+from src.database.db import get_db, get_session_factory
 from src.services.auth import create_access_token, create_email_token, Hash
 import fakeredis
 from src.redis.redis import get_redis
+from src.services.user_cache import user_l1_cache, token_version_cache
+from src.services.prefix_index import contact_prefix_indexes
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./var/test.db"
@@ -67,6 +69,7 @@ def client():
                 raise
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
     yield TestClient(app)
 
@@ -75,6 +78,13 @@ async def get_token():
     token = await create_access_token(data={"sub": test_user["username"]})
     return token
 
+@pytest_asyncio.fixture()
+async def get_claims_token():
+    token = await create_access_token(
+        data={"sub": test_user["username"], "uid": 1, "role": test_user["role"], "ver": 0}
+    )
+    return token
+
 @pytest_asyncio.fixture()
 async def get_reset_token():
     token = create_email_token({"sub": test_user["username"], "token_type": "reset"})
@@ -82,7 +92,10 @@ async def get_reset_token():
 
 @pytest.fixture(scope="module", autouse=True)
 def override_redis():
-    fake_redis = fakeredis.FakeRedis()
+    fake_redis = fakeredis.FakeAsyncRedis()
+    user_l1_cache.clear()
+    token_version_cache.clear()
+    contact_prefix_indexes.clear()
 
     # Override the dependency
     def override_get_redis():
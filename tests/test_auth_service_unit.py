@@ -0,0 +1,26 @@
+import pytest
+from fastapi import HTTPException
+
+from src.services.auth import create_access_token, decode_access_token, jwt_claims_cache
+
+
+@pytest.mark.asyncio
+async def test_decode_access_token_cached():
+    jwt_claims_cache.clear()
+    token = await create_access_token(data={"sub": "testuser", "uid": 1})
+
+    payload = decode_access_token(token)
+    assert payload["sub"] == "testuser"
+    assert decode_access_token(token) is payload
+    assert jwt_claims_cache.stats()["hits"] == 1
+    assert jwt_claims_cache.stats()["size"] == 1
+
+
+def test_decode_access_token_invalid():
+    jwt_claims_cache.clear()
+
+    with pytest.raises(HTTPException) as e:
+        decode_access_token("abcde12345")
+
+    assert e.value.status_code == 401
+    assert len(jwt_claims_cache) == 0
@@ -0,0 +1,94 @@
+from datetime import date, datetime
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import ContactRepository
+from src.schemas import TokenClaims
+from src.services.birthdays import build_birthdays, get_birthday_ids, next_birthday
+
+today = date(2025, 12, 20)
+user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+
+@pytest_asyncio.fixture()
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [{"id": i, "username": f"user{i}", "email": f"user{i}@example.com"} for i in (1, 2)],
+        )
+        await conn.execute(
+            insert(Contact),
+            [
+                {
+                    "id": contact_id,
+                    "firstname": "First",
+                    "lastname": "Last",
+                    "email": f"contact{contact_id}@example.com",
+                    "phone": "380671234567",
+                    "birthday": birthday,
+                    "description": "Birthday contact",
+                    "user_id": user_id,
+                }
+                for contact_id, user_id, birthday in [
+                    (1, 1, datetime(1990, 12, 25)),
+                    (2, 1, datetime(1985, 1, 5)),
+                    (3, 1, datetime(1980, 6, 1)),
+                    (4, 2, datetime(1970, 12, 21)),
+                ]
+            ],
+        )
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+def test_next_birthday():
+    assert next_birthday(1225, today) == date(2025, 12, 25)
+    assert next_birthday(105, today) == date(2026, 1, 5)
+    assert next_birthday(229, date(2025, 2, 1)) == date(2025, 2, 28)
+    assert next_birthday(229, date(2024, 2, 1)) == date(2024, 2, 29)
+
+
+@pytest.mark.asyncio
+async def test_build_birthdays(session):
+    redis = fakeredis.FakeAsyncRedis()
+    assert await get_birthday_ids(redis, 1, today, 7) is None
+
+    assert await build_birthdays(redis, session, today) == 3
+    assert await get_birthday_ids(redis, 1, today, 7) == [1]
+    assert await get_birthday_ids(redis, 1, today, 30) == [1, 2]
+    assert await get_birthday_ids(redis, 2, today, 7) == [4]
+    # Window past materialized days is a miss
+    assert await get_birthday_ids(redis, 1, date(2025, 12, 25), 30) is None
+
+
+@pytest.mark.asyncio
+async def test_birthdays_maintained_by_repository(session):
+    redis = fakeredis.FakeAsyncRedis()
+    await build_birthdays(redis, session, today)
+    repository = ContactRepository(session, redis)
+
+    contact = await repository.get_contact_by_id(3, user)
+    contact.birthday = datetime(1980, 12, 22)
+    await session.commit()
+    await repository.update_materialized(contact)
+    assert await get_birthday_ids(redis, 1, today, 7) == [3, 1]
+
+    await repository.remove_contact(1, user)
+    assert await get_birthday_ids(redis, 1, today, 7) == [3]
+    contacts = await repository.birthdays_contacts(0, 10, user, days=30, today=today)
+    assert [contact.id for contact in contacts] == [2, 3]
+
+    # Served from the set, SQL window is not used
+    await redis.zrem("birthdays:1", 2)
+    contacts = await repository.birthdays_contacts(0, 10, user, days=30, today=today)
+    assert [contact.id for contact in contacts] == [3]
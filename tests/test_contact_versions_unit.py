@@ -0,0 +1,68 @@
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.services.contact_versions import (
+    CONTACTS_VERSION_KEY,
+    bump_contacts_version,
+    etag_matches,
+    get_contacts_version,
+    parse_if_match,
+)
+
+
+@pytest.mark.asyncio
+async def test_contacts_version_is_stable_until_bumped():
+    redis = fakeredis.FakeAsyncRedis()
+    version = await get_contacts_version(redis, 1)
+    assert await get_contacts_version(redis, 1) == version
+    assert await get_contacts_version(redis, 2) != version
+
+    await bump_contacts_version(redis, 1)
+    bumped = await get_contacts_version(redis, 1)
+    assert bumped != version
+
+    # A lost version is never restarted from a value seen before
+    await redis.delete(CONTACTS_VERSION_KEY.format(1))
+    assert await get_contacts_version(redis, 1) not in (version, bumped)
+
+
+@pytest.mark.asyncio
+async def test_contacts_version_unknown_without_redis(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis()
+
+    async def get(key):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(redis, "get", get)
+    assert await get_contacts_version(redis, 1) is None
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"old", "abc"', True),
+        ("*", True),
+        ('"old"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("*", None),
+        ('"3"', [3]),
+        ('"3", "5"', [3, 5]),
+        ('W/"3"', []),
+        ('"abc"', []),
+    ],
+)
+def test_parse_if_match(header, expected):
+    assert parse_if_match(header) == expected
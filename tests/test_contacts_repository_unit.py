@@ -1,11 +1,13 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from datetime import date
+from sqlalchemy import Delete, Update
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
 
 from src.database.models import Contact, User
 from src.repository.contacts import ContactRepository
+from src.services.birthdays import birthday_window
 from src.schemas import ContactModel
 
 
@@ -132,18 +134,18 @@ async def test_update_contact(contact_repository, mock_session, user):
         birthday="1980-01-01",
         description="Lorem ipsum description",
     )
-    existing_contact = Contact(
+    updated_contact = Contact(
         id=1,
-        firstname="sdfsdfsdfwef",
+        firstname="updated",
         lastname="sdfsdfsdf",
         email="ffffffff@email.com",
         phone="380671222222",
-        birthday="1980-01-01",
+        birthday=date(1980, 1, 1),
         description="Lorem ipsum description",
         user=user,
     )
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = existing_contact
+    mock_result.scalar_one_or_none.return_value = updated_contact
     mock_session.execute = AsyncMock(return_value=mock_result)
 
     # Call method
@@ -159,8 +161,11 @@ async def test_update_contact(contact_repository, mock_session, user):
     assert result.phone == "380671222222"
     assert result.birthday == date(1980, 1, 1)
     assert result.description == "Lorem ipsum description"
+    # Single UPDATE ... RETURNING, no SELECT before and no refresh after
+    mock_session.execute.assert_awaited_once()
+    assert isinstance(mock_session.execute.await_args.args[0], Update)
     mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(existing_contact)
+    mock_session.refresh.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -187,5 +192,28 @@ async def test_remove_contact(contact_repository, mock_session, user):
     assert result.lastname == "lastname"
     assert result.email == "test34@email.com"
     assert result.phone == "380671234567"
-    mock_session.delete.assert_awaited_once_with(existing_contact)
+    # Single DELETE ... RETURNING
+    mock_session.execute.assert_awaited_once()
+    assert isinstance(mock_session.execute.await_args.args[0], Delete)
+    mock_session.delete.assert_not_awaited()
     mock_session.commit.assert_awaited_once()
+
+
+def window_keys(today, days):
+    return birthday_window(today, days).right.value
+
+
+def test_birthday_window_new_year():
+    assert window_keys(date(2025, 12, 30), 3) == [101, 102, 1230, 1231]
+
+
+def test_birthday_window_leap_day():
+    # 29 February is celebrated on 28 February in non-leap years
+    assert window_keys(date(2025, 2, 27), 1) == [227, 228, 229]
+    assert window_keys(date(2025, 3, 1), 0) == [301]
+    assert window_keys(date(2024, 2, 28), 0) == [228]
+    assert window_keys(date(2024, 2, 28), 1) == [228, 229]
+
+
+def test_birthday_window_whole_year():
+    assert str(birthday_window(date(2025, 6, 1), 365)) == "true"
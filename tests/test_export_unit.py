@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, Contact, User
+from src.schemas import TokenClaims
+from src.services.export import EXPORT_COLUMNS, ExportFormat, export_contacts
+
+user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+
+async def seeded_session_factory(contacts: int):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": 1, "username": "user1", "email": "user1@example.com"}])
+        await conn.execute(
+            insert(Contact),
+            [
+                {
+                    "firstname": f"First{i}",
+                    "lastname": "Last, \"quoted\"",
+                    "email": f"contact{i}@example.com",
+                    "phone": "380671234567",
+                    "birthday": datetime(1990, 1, 1),
+                    "description": "Exported contact",
+                    "user_id": 1,
+                }
+                for i in range(contacts)
+            ],
+        )
+    return engine, async_sessionmaker(engine)
+
+
+@pytest.mark.asyncio
+async def test_export_csv_and_ndjson():
+    engine, session_factory = await seeded_session_factory(25)
+
+    chunks = [chunk async for chunk in export_contacts(session_factory, user, ExportFormat.csv, 10)]
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert len(chunks) == 4
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert len(rows) == 26
+    assert rows[1][:3] == ["1", "First0", 'Last, "quoted"']
+    assert rows[1][5] == "1990-01-01"
+
+    chunks = [chunk async for chunk in export_contacts(session_factory, user, ExportFormat.ndjson, 10)]
+    contacts = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(contacts) == 25
+    assert contacts[-1]["firstname"] == "First24"
+    assert contacts[-1]["done"] is False
+    await engine.dispose()
+
+
+async def export_peak_memory(contacts: int) -> int:
+    engine, session_factory = await seeded_session_factory(contacts)
+    tracemalloc.start()
+    async for chunk in export_contacts(session_factory, user, ExportFormat.ndjson, 500):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    await engine.dispose()
+    return peak
+
+
+@pytest.mark.asyncio
+async def test_export_memory_does_not_grow_with_rows():
+    small = await export_peak_memory(1000)
+    large = await export_peak_memory(10000)
+    assert large < small * 2, (small, large)
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.hashing import HashingService
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_password():
+    hashing_service = HashingService(max_workers=2, max_queue=2)
+    hashed = await hashing_service.get_password_hash("secret_password")
+
+    assert await hashing_service.verify_password("secret_password", hashed)
+    assert not await hashing_service.verify_password("wrong_password", hashed)
+
+    stats = hashing_service.stats()
+    assert stats["completed"] == 3
+    assert stats["rejected"] == 0
+    assert stats["hash_time_avg"] > 0
+    hashing_service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reject_when_queue_is_full():
+    hashing_service = HashingService(max_workers=1, max_queue=1)
+
+    results = await asyncio.gather(
+        *(hashing_service.get_password_hash("secret_password") for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert hashing_service.stats()["rejected"] == 1
+    assert hashing_service.stats()["queue_wait_max"] > 0
+    hashing_service.shutdown()
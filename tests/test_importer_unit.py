@@ -0,0 +1,148 @@
+import io
+import os
+import tempfile
+
+import fakeredis
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, Contact, User
+from src.schemas import ImportStatus, TokenClaims
+from src.services.importer import (
+    PARSERS,
+    ImportFormat,
+    create_job,
+    detect_format,
+    get_job,
+    parse_csv,
+    parse_vcard,
+    run_import,
+)
+
+user = TokenClaims(id=1, username="user1", role="USER", token_version=0)
+
+CSV = (
+    "﻿Firstname,lastname,email,phone,birthday,description,extra\r\n"
+    "John,Smith,john@example.com,380671234567,1990-01-15,\"Friend, from school\",x\r\n"
+    "\r\n"
+    "Bad,Phone,bad@example.com,call me,1990-01-15,,x\r\n"
+    "Jane,Doe,jane@example.com,380671234568,1991-02-20,,x\r\n"
+    "No,Email,,380671234569,1992-03-25,,x\r\n"
+)
+
+VCARD = (
+    "BEGIN:VCARD\r\n"
+    "VERSION:3.0\r\n"
+    "N:Smith;John;;;\r\n"
+    "FN:John Smith\r\n"
+    "item1.EMAIL;TYPE=work:john@example.com\r\n"
+    "EMAIL:other@example.com\r\n"
+    "TEL;TYPE=cell:380671234567\r\n"
+    "BDAY:19900115\r\n"
+    "NOTE:Met at\\, conference\r\n"
+    "  in Kyiv\r\n"
+    "END:VCARD\r\n"
+    "BEGIN:VCARD\r\n"
+    "FN:Jane Doe\r\n"
+    "EMAIL:jane@example.com\r\n"
+    "TEL:380671234568\r\n"
+    "BDAY:1991-02-20\r\n"
+    "END:VCARD\r\n"
+)
+
+
+def test_detect_format():
+    assert detect_format("contacts.VCF") == ImportFormat.vcard
+    assert detect_format("contacts.csv") == ImportFormat.csv
+    assert detect_format(None) == ImportFormat.csv
+
+
+def test_parse_csv():
+    rows = list(parse_csv(io.BytesIO(CSV.encode())))
+    assert [number for number, _ in rows] == [1, 3, 4, 5]
+    assert rows[0][1] == {
+        "firstname": "John",
+        "lastname": "Smith",
+        "email": "john@example.com",
+        "phone": "380671234567",
+        "birthday": "1990-01-15",
+        "description": "Friend, from school",
+    }
+
+
+def test_parse_vcard():
+    cards = list(parse_vcard(io.BytesIO(VCARD.encode())))
+    assert cards == [
+        (
+            1,
+            {
+                "firstname": "John",
+                "lastname": "Smith",
+                "email": "john@example.com",
+                "phone": "380671234567",
+                "birthday": "1990-01-15",
+                "description": "Met at, conference in Kyiv",
+            },
+        ),
+        (
+            2,
+            {
+                "firstname": "Jane",
+                "lastname": "Doe",
+                "email": "jane@example.com",
+                "phone": "380671234568",
+                "birthday": "1991-02-20",
+                "description": "",
+            },
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_import():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": 1, "username": "user1", "email": "user1@example.com"}])
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    redis = fakeredis.FakeAsyncRedis()
+
+    with tempfile.NamedTemporaryFile(delete=False) as file:
+        file.write(CSV.encode())
+    job = await create_job(redis, user.id)
+    await run_import(redis, session_factory, user, file.name, ImportFormat.csv, job, batch_size=1)
+
+    job = await get_job(redis, user.id, job.id)
+    assert job.status == ImportStatus.done
+    assert (job.processed, job.accepted, job.rejected) == (4, 2, 2)
+    assert [error.row for error in job.errors] == [3, 5]
+    assert job.errors[0].errors[0].startswith("phone:")
+    assert await get_job(redis, 2, job.id) is None
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(Contact)) == 2
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_run_import_unexpected_error(monkeypatch):
+    def broken_parser(file):
+        raise KeyError("firstname")
+        yield
+
+    monkeypatch.setitem(PARSERS, ImportFormat.csv, broken_parser)
+    redis = fakeredis.FakeAsyncRedis()
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    with tempfile.NamedTemporaryFile(delete=False) as file:
+        file.write(CSV.encode())
+    job = await create_job(redis, user.id)
+    await run_import(redis, session_factory, user, file.name, ImportFormat.csv, job)
+
+    job = await get_job(redis, user.id, job.id)
+    assert job.status == ImportStatus.failed
+    assert job.detail == "'firstname'"
+    assert not os.path.exists(file.name)
+    await engine.dispose()
@@ -2,9 +2,14 @@ from unittest.mock import Mock
 
 import pytest
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from main import app
+from src.database.db import get_db
 from src.database.models import User
-from tests.conftest import TestingSessionLocal
+from src.services.auth import Hash, create_access_token, create_email_token
+from src.services.user_cache import user_l1_cache
+from tests.conftest import TestingSessionLocal, engine
 
 user_data = {
     "username": "agent007",
@@ -238,3 +243,174 @@ def test_validation_error_login(client):
     assert response.status_code == 422, response.text
     data = response.json()
     assert "detail" in data
+
+def login(client):
+    response = client.post(
+        "api/auth/login",
+        data={
+            "username": user_data.get("username"),
+            "password": user_data.get("password"),
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_refresh_token_rotation(client):
+    tokens = login(client)
+
+    response = client.post(
+        "api/auth/refresh-token", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    # Reuse of rotated token revokes all sessions
+    response = client.post(
+        "api/auth/refresh-token", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+    response = client.post(
+        "api/auth/refresh-token", json={"refresh_token": rotated["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+
+def test_logout(client):
+    first = login(client)
+    second = login(client)
+
+    response = client.post("api/auth/logout", json={"refresh_token": first["refresh_token"]})
+    assert response.status_code == 200, response.text
+
+    response = client.post(
+        "api/auth/logout-all",
+        headers={"Authorization": f"Bearer {second['access_token']}"},
+    )
+    assert response.status_code == 200, response.text
+
+    for tokens in (second, first):
+        response = client.post(
+            "api/auth/refresh-token", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == 401, response.text
+
+def test_logout_revokes_access_token(client):
+    tokens = login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("api/users/me", headers=headers).status_code == 200
+
+    response = client.post(
+        "api/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    assert client.get("api/users/me", headers=headers).status_code == 401
+    assert client.get("api/contacts", headers=headers).status_code == 401
+
+def test_refresh_token_is_not_bearer_token(client):
+    tokens = login(client)
+    headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert client.get("api/users/me", headers=headers).status_code == 401
+
+    response = client.post("api/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200, response.text
+    assert client.get("api/users/me", headers=headers).status_code == 401
+    assert client.get("api/contacts/", headers=headers).status_code == 401
+
+
+@pytest.fixture()
+def expiring_sessions():
+    # Production sessions expire attributes on commit, unlike TestingSessionLocal
+    ExpiringSessionLocal = async_sessionmaker(autoflush=False, bind=engine)
+
+    async def override_get_db():
+        async with ExpiringSessionLocal() as session:
+            yield session
+
+    previous = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides[get_db] = previous
+
+
+reset_user = {
+    "username": "ResetUser",
+    "email": "reset_user@gmail.com",
+    "password": "12345678",
+}
+
+
+@pytest.mark.asyncio
+async def test_password_change_with_expiring_session(client, expiring_sessions):
+    reset_token = create_email_token({"sub": reset_user["email"], "token_type": "reset"})
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                username=reset_user["username"],
+                email=reset_user["email"],
+                hashed_password=Hash().get_password_hash(reset_user["password"]),
+                confirmed=True,
+                password_reset_token=reset_token,
+            )
+        )
+        await session.commit()
+
+    response = client.post(
+        "api/auth/login",
+        data={"username": reset_user["username"], "password": reset_user["password"]},
+    )
+    assert response.status_code == 200, response.text
+    tokens = response.json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("api/contacts/?limit=1", headers=headers).status_code == 200
+
+    response = client.post(
+        "api/auth/change-password",
+        json={
+            "new_password": "NewPassword",
+            "confirm_password": "NewPassword",
+            "reset_password_token": reset_token,
+        },
+    )
+    assert response.status_code == 200, response.text
+    assert user_l1_cache.get(reset_user["username"]) is None
+
+    # Access tokens issued before the reset carry the old token version
+    response = client.get("api/contacts/?limit=1", headers=headers)
+    assert response.status_code == 401, response.text
+    refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert client.get("api/users/me", headers=refresh_headers).status_code == 401
+    assert client.get("api/contacts/", headers=refresh_headers).status_code == 401
+
+    # Refresh sessions opened before the reset are closed
+    response = client.post(
+        "api/auth/refresh-token", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+
+
+@pytest.mark.asyncio
+async def test_token_without_version_revoked_by_bump(client):
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                username="bumped_user",
+                email="bumped_user@gmail.com",
+                hashed_password=Hash().get_password_hash("12345678"),
+                confirmed=True,
+                token_version=1,
+            )
+        )
+        await session.commit()
+
+    # Issued before tokens carried ver
+    token = await create_access_token(data={"sub": "bumped_user"})
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("api/users/me", headers=headers).status_code == 401
+    assert client.get("api/contacts/", headers=headers).status_code == 401
+
+    token = await create_access_token(data={"sub": "bumped_user", "ver": 1})
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("api/users/me", headers=headers).status_code == 200
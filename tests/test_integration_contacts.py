@@ -1,4 +1,15 @@
 import datetime
+import json
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from conftest import test_user
+from main import app
+from src.redis.redis import get_redis
+from src.services.contact_versions import CONTACTS_VERSION_KEY
+from src.services.response_cache import contact_responses
+from src.services.auth import create_access_token
 
 def test_create_contact(client, get_token):
     """Test create contact endpoint
@@ -209,3 +220,428 @@ def test_repeat_delete_contact(client, get_token):
     assert response.status_code == 404, response.text
     data = response.json()
     assert data["detail"] == "Contact not found"
+
+
+def test_get_contacts_with_claims_token(client, get_claims_token):
+    response = client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {get_claims_token}"}
+    )
+    assert response.status_code == 200, response.text
+    assert isinstance(response.json(), list)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_revoked_token_version(client):
+    token = await create_access_token(
+        data={"sub": test_user["username"], "uid": 1, "role": test_user["role"], "ver": 5}
+    )
+    response = client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 401, response.text
+
+
+def create_contact(client, token, lastname):
+    response = client.post(
+        "/api/contacts",
+        json={
+            "firstname": "Paged",
+            "lastname": lastname,
+            "email": f"{lastname.lower()}@email.com",
+            "phone": "380671444444",
+            "birthday": "1990-05-05",
+            "description": "Pagination contact",
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_get_contacts_cursor_pagination(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    for lastname in ("Charlie", "Alpha", "Bravo"):
+        create_contact(client, get_token, lastname)
+
+    response = client.get("/api/contacts?limit=2&order_by=lastname", headers=headers)
+    assert response.status_code == 200, response.text
+    first_page = [contact["lastname"] for contact in response.json()]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        f"/api/contacts?limit=2&order_by=lastname&cursor={cursor}", headers=headers
+    )
+    assert response.status_code == 200, response.text
+    second_page = [contact["lastname"] for contact in response.json()]
+    assert "X-Next-Cursor" not in response.headers
+
+    assert first_page + second_page == ["Alpha", "Bravo", "Charlie"]
+
+
+@pytest.mark.parametrize("order_by", ["id", "lastname", "updated_at"])
+def test_get_contacts_cursor_pages_every_contact_once(client, get_token, order_by):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    # Created within the same second, equal lastnames and timestamps tie on id
+    created = [
+        create_contact(client, get_token, lastname)["id"]
+        for lastname in ("Echo", "Delta", "Echo", "Delta", "Foxtrot")
+    ]
+    response = client.get("/api/contacts?limit=1000", headers=headers)
+    expected = sorted(contact["id"] for contact in response.json())
+
+    ids = []
+    url = f"/api/contacts?limit=2&order_by={order_by}"
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.text
+        ids += [contact["id"] for contact in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        url = cursor and f"/api/contacts?limit=2&order_by={order_by}&cursor={cursor}"
+    assert sorted(ids) == expected
+
+    for contact_id in created:
+        assert client.delete(f"/api/contacts/{contact_id}", headers=headers).status_code == 200
+
+
+def test_get_contacts_invalid_cursor(client, get_token):
+    response = client.get(
+        "/api/contacts?cursor=abc&order_by=id",
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_search_contact_all_fields(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts/search/all?query=RAV", headers=headers)
+    assert response.status_code == 200, response.text
+    assert [contact["lastname"] for contact in response.json()] == ["Bravo"]
+
+    response = client.get("/api/contacts/search/email?query=a", headers=headers)
+    assert response.status_code == 200, response.text
+    assert sorted(contact["lastname"] for contact in response.json()) == ["Alpha", "Bravo", "Charlie"]
+
+
+def test_suggest_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts/suggest?q=br", headers=headers)
+    assert response.status_code == 200, response.text
+    assert [contact["lastname"] for contact in response.json()] == ["Bravo"]
+
+    created = create_contact(client, get_token, "Brown")
+    response = client.get("/api/contacts/suggest?q=BR&limit=5", headers=headers)
+    assert [contact["lastname"] for contact in response.json()] == ["Bravo", "Brown"]
+
+    client.delete(f"/api/contacts/{created['id']}", headers=headers)
+    response = client.get("/api/contacts/suggest?q=paged c", headers=headers)
+    assert response.json() == [
+        {"id": response.json()[0]["id"], "firstname": "Paged", "lastname": "Charlie", "email": "charlie@email.com"}
+    ]
+    response = client.get("/api/contacts/suggest?q=brown", headers=headers)
+    assert response.json() == []
+
+
+def test_get_contacts_birthdays_window(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    today = datetime.date.today()
+    birthday = (today + datetime.timedelta(days=20)).replace(year=1990)
+    if birthday.month == 2 and birthday.day == 29:
+        birthday = birthday.replace(day=28)
+    response = client.post(
+        "/api/contacts",
+        json={
+            "firstname": "Birthday",
+            "lastname": "Window",
+            "email": "window@email.com",
+            "phone": "380671555555",
+            "birthday": birthday.isoformat(),
+            "description": "Birthday contact",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.get("/api/contacts/birthdays/?days=30&tz=Europe/Kyiv", headers=headers)
+    assert response.status_code == 200, response.text
+    assert "Window" in [contact["lastname"] for contact in response.json()]
+
+    response = client.get("/api/contacts/birthdays/?days=7", headers=headers)
+    assert "Window" not in [contact["lastname"] for contact in response.json()]
+
+
+def test_get_contacts_birthdays_invalid_timezone(client, get_token):
+    response = client.get(
+        "/api/contacts/birthdays/?tz=Mars/Olympus",
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid timezone"
+
+
+def bulk_contact(index, **fields):
+    return {
+        "firstname": "Bulk",
+        "lastname": f"Contact{index}",
+        "email": f"bulk{index}@email.com",
+        "phone": "380671666666",
+        "birthday": "1995-03-15",
+        "description": "Bulk contact",
+        **fields,
+    }
+
+
+def test_create_contacts_bulk(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post(
+        "/api/contacts/bulk", json=[bulk_contact(i) for i in range(3)], headers=headers
+    )
+    assert response.status_code == 201, response.text
+    data = response.json()
+    assert [contact["lastname"] for contact in data] == ["Contact0", "Contact1", "Contact2"]
+    assert len({contact["id"] for contact in data}) == 3
+
+    response = client.get(f"/api/contacts/{data[1]['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["email"] == "bulk1@email.com"
+
+
+def test_create_contacts_bulk_invalid_item(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post(
+        "/api/contacts/bulk",
+        json=[bulk_contact(10), bulk_contact(11, phone="abc"), bulk_contact(12, email="x")],
+        headers=headers,
+    )
+    assert response.status_code == 422, response.text
+    locations = [error["loc"] for error in response.json()["detail"]]
+    assert locations == [["body", 1, "phone"], ["body", 2, "email"]]
+
+    response = client.get("/api/contacts/search/lastname?query=Contact10", headers=headers)
+    assert response.json() == []
+
+    response = client.post("/api/contacts/bulk", json=[], headers=headers)
+    assert response.status_code == 422, response.text
+
+
+def test_export_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contacts = client.get("/api/contacts?limit=1000", headers=headers).json()
+
+    response = client.get("/api/contacts/export?format=csv", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "contacts.csv" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,firstname,lastname")
+    assert len(lines) == len(contacts) + 1
+
+    response = client.get("/api/contacts/export?format=ndjson", headers=headers)
+    assert response.status_code == 200, response.text
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [contact["id"] for contact in exported] == [contact["id"] for contact in contacts]
+    assert exported[0]["birthday"] == contacts[0]["birthday"]
+
+
+def test_import_contacts(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    content = (
+        "firstname,lastname,email,phone,birthday\n"
+        "Imported,Person,imported@email.com,380671777777,1988-08-08\n"
+        "Broken,Person,broken,380671777778,1988-08-08\n"
+    )
+    response = client.post(
+        "/api/contacts/import",
+        files={"file": ("contacts.csv", content, "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 202, response.text
+    job_id = response.json()["id"]
+
+    response = client.get(f"/api/contacts/import/{job_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    job = response.json()
+    assert job["status"] == "done"
+    assert (job["accepted"], job["rejected"]) == (1, 1)
+    assert job["errors"][0]["row"] == 2
+
+    response = client.get("/api/contacts/search/email?query=imported@email.com", headers=headers)
+    assert response.json()[0]["lastname"] == "Person"
+
+    response = client.get("/api/contacts/import/unknown", headers=headers)
+    assert response.status_code == 404, response.text
+
+
+def test_contacts_by_ids_bulk_update_and_remove(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.post(
+        "/api/contacts/bulk",
+        json=[bulk_contact(i, email=f"ids{i}@email.com") for i in range(3)],
+        headers=headers,
+    )
+    ids = [contact["id"] for contact in response.json()]
+    missing = max(ids) + 1000
+
+    response = client.get(
+        f"/api/contacts?ids={ids[2]},{ids[0]},{missing}", headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert [contact["id"] for contact in response.json()] == [ids[0], ids[2]]
+    assert response.headers["X-Not-Found-Ids"] == str(missing)
+
+    response = client.get("/api/contacts?ids=1,x", headers=headers)
+    assert response.status_code == 400, response.text
+
+    response = client.patch(
+        "/api/contacts/bulk",
+        json={"ids": ids + [missing], "fields": {"done": True, "description": "Patched"}},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"affected": ids, "not_found": [missing]}
+    response = client.get(f"/api/contacts/{ids[1]}", headers=headers)
+    assert response.json()["done"] is True
+    assert response.json()["description"] == "Patched"
+
+    response = client.patch(
+        "/api/contacts/bulk", json={"ids": ids, "fields": {}}, headers=headers
+    )
+    assert response.status_code == 422, response.text
+
+    response = client.request(
+        "DELETE", "/api/contacts/bulk", json={"ids": ids[:2] + [missing]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"affected": ids[:2], "not_found": [missing]}
+    response = client.get(f"/api/contacts?ids={','.join(map(str, ids))}", headers=headers)
+    assert [contact["id"] for contact in response.json()] == [ids[2]]
+
+
+def test_conditional_reads(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contact = create_contact(client, get_token, "Etagged")
+
+    for url in ("/api/contacts?limit=5", f"/api/contacts/{contact['id']}"):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.text
+        etag = response.headers["ETag"]
+
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+        response = client.patch(
+            f"/api/contacts/{contact['id']}", json={"done": True}, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200, response.text
+        assert response.headers["ETag"] != etag
+
+
+def test_update_contact_if_match(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contact = create_contact(client, get_token, "Versioned")
+    url = f"/api/contacts/{contact['id']}"
+    response = client.get(url, headers=headers)
+    etag = response.headers["ETag"]
+    assert etag == f'"{contact["version"]}"'
+
+    update = {**contact, "description": "First writer"}
+    response = client.put(url, json=update, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.json()["version"] == contact["version"] + 1
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    # Second writer still holds the old version
+    update = {**contact, "description": "Second writer"}
+    response = client.put(url, json=update, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412, response.text
+    response = client.patch(url, json={"done": True}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412, response.text
+    response = client.patch(url, json={"done": True}, headers={**headers, "If-Match": f"W/{new_etag}"})
+    assert response.status_code == 412, response.text
+    assert client.get(url, headers=headers).json()["description"] == "First writer"
+
+    response = client.patch(url, json={"done": True}, headers={**headers, "If-Match": new_etag})
+    assert response.status_code == 200, response.text
+    response = client.patch("/api/contacts/999999", json={"done": True}, headers={**headers, "If-Match": new_etag})
+    assert response.status_code == 404, response.text
+
+
+def test_cached_reads_follow_writes(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contact = create_contact(client, get_token, "Cached")
+    url = "/api/contacts/search/lastname?query=Cached"
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200, first.text
+    hits = contact_responses.hits
+    second = client.get(url, headers=headers)
+    assert contact_responses.hits == hits + 1
+    assert second.json() == first.json()
+    assert second.headers["content-type"] == "application/json"
+
+    response = client.patch(
+        f"/api/contacts/{contact['id']}", json={"done": not contact["done"]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    third = client.get(url, headers=headers)
+    assert third.json()[0]["done"] is not contact["done"]
+
+
+def test_reads_bypass_cache_without_contacts_version(client, get_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contact = create_contact(client, get_token, "Uncached")
+    url = "/api/contacts/search/lastname?query=Uncached"
+    assert client.get(url, headers=headers).status_code == 200
+
+    redis = app.dependency_overrides[get_redis]()
+    get = redis.get
+    version_prefix = CONTACTS_VERSION_KEY.format("")
+
+    async def get_without_versions(key):
+        if key.startswith(version_prefix):
+            raise ConnectionError("Redis is down")
+        return await get(key)
+
+    monkeypatch.setattr(redis, "get", get_without_versions)
+    hits, misses = contact_responses.hits, contact_responses.misses
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()[0]["id"] == contact["id"]
+    response = client.get("/api/contacts?limit=1", headers=headers)
+    assert response.status_code == 200, response.text
+    assert "ETag" not in response.headers
+    assert (contact_responses.hits, contact_responses.misses) == (hits, misses)
+
+
+def test_sparse_fieldsets(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contact = create_contact(client, get_token, "Sparse")
+    fields = "phone,lastname,id,firstname"
+    expected = {name: contact[name] for name in ("firstname", "lastname", "phone", "id")}
+
+    response = client.get(f"/api/contacts?ids={contact['id']}&fields={fields}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == [expected]
+    # Keys follow ContactResponse order
+    assert list(response.json()[0]) == ["firstname", "lastname", "phone", "id"]
+
+    response = client.get(
+        "/api/contacts/search/lastname?query=Sparse&fields=lastname&order_by=updated_at&limit=1",
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"lastname": "Sparse"}]
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get("/api/contacts/birthdays/?days=365&fields=birthday", headers=headers)
+    assert response.status_code == 200, response.text
+    assert {"birthday": contact["birthday"]} in response.json()
+
+    response = client.get("/api/contacts?fields=id,password", headers=headers)
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid fields"
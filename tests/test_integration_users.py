@@ -1,6 +1,10 @@
 from unittest.mock import patch
 
-from conftest import test_user
+import pytest
+
+from conftest import TestingSessionLocal, test_user
+from src.database.models import User
+from src.services.auth import create_access_token
 
 
 def test_get_me(client, get_token):
@@ -40,3 +44,20 @@ def test_update_avatar_user(mock_upload_file, client, get_token):
 
     # Перевірка виклику функції upload_file з об'єктом UploadFile
     mock_upload_file.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("src.services.upload_file.UploadFileService.upload_file")
+async def test_update_avatar_user_not_admin(mock_upload_file, client):
+    async with TestingSessionLocal() as session:
+        session.add(User(username="plain_user", email="plain_user@example.com", confirmed=True))
+        await session.commit()
+    token = await create_access_token(data={"sub": "plain_user"})
+
+    response = client.patch(
+        "/api/users/avatar",
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("avatar.jpg", b"fake image content", "image/jpeg")},
+    )
+    assert response.status_code == 403, response.text
+    mock_upload_file.assert_not_called()
@@ -12,3 +12,23 @@ def test_healthchecker(client, get_token):
     assert response.status_code == 200, response.text
     data = response.json()
     assert data["message"] == "Welcome to FastAPI!"
+
+
+def test_cache_stats(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    client.get("/api/users/me", headers=headers)
+
+    response = client.get("/api/cache-stats", headers=headers)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["users"]["hits"] >= 1
+    assert {"size", "maxsize", "misses", "evictions"} <= data["users"].keys()
+
+
+def test_hashing_stats(client, get_token):
+    response = client.get(
+        "/api/hashing-stats", headers={"Authorization": f"Bearer {get_token}"}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert {"pending", "completed", "rejected", "queue_wait_avg", "hash_time_avg"} <= data.keys()
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from src.services.prefix_index import PrefixIndex, PrefixIndexCache, SuggestItem
+
+items = [
+    SuggestItem(1, "John", "Smith", "john@example.com"),
+    SuggestItem(2, "Johanna", "Doe", "jd@example.com"),
+    SuggestItem(3, "Adam", "Johnson", "adam@example.com"),
+]
+
+
+def test_prefix_index_search():
+    index = PrefixIndex(items)
+
+    assert [item.id for item in index.search("JOH", 10)] == [2, 1, 3]
+    assert [item.id for item in index.search("john s", 10)] == [1]
+    assert [item.id for item in index.search("jd@", 10)] == [2]
+    assert index.search("x", 10) == []
+    assert len(index.search("j", 2)) == 2
+
+
+def test_prefix_index_update_and_remove():
+    index = PrefixIndex(items)
+    index.add(SuggestItem(1, "Jack", "Smith", "jack@example.com"))
+    index.remove(3)
+    index.remove(42)
+
+    assert [item.id for item in index.search("joh", 10)] == [2]
+    assert index.search("jack", 10)[0].firstname == "Jack"
+    assert len(index) == 2
+
+
+@pytest.mark.asyncio
+async def test_prefix_index_cache_builds_once():
+    cache = PrefixIndexCache(maxsize=2)
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return items
+
+    indexes = await asyncio.gather(cache.get(1, loader), cache.get(1, loader))
+    assert loads == 1
+    assert indexes[0] is indexes[1]
+
+    cache.add(1, SuggestItem(4, "Bob", "Brown", "bob@example.com"))
+    assert (await cache.get(1, loader)).search("bob", 10)[0].id == 4
+    assert loads == 1
+
+    # Index of a user without loaded index is not built by writes
+    cache.remove(2, 4)
+    assert len(cache.indexes) == 1
+
+
+@pytest.mark.asyncio
+async def test_prefix_index_cache_skips_stale_build():
+    cache = PrefixIndexCache(maxsize=2)
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return items
+
+    build = asyncio.ensure_future(cache.get(1, loader))
+    await asyncio.sleep(0)
+    cache.remove(1, 3)
+    await build
+
+    assert cache.indexes.get(1) is None
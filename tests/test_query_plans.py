@@ -0,0 +1,170 @@
+"""Query plan regression tests
+
+Every repository query is captured, explained on a seeded database and
+must not fall back to a full table or index scan or sort pages in memory.
+"""
+import asyncio
+import re
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import ContactRepository
+from src.repository.users import UserRepository
+from src.schemas import ContactOrder, TokenClaims
+
+USERS = 20
+CONTACTS_PER_USER = 200
+
+user = TokenClaims(id=3, username="user3", role="USER", token_version=0)
+
+
+class CaptureSession:
+    """Session stub recording statements instead of running them"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def get_bind(self):
+        return self.engine.sync_engine
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return MagicMock()
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    async def seed():
+        now = datetime.now()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "id": i,
+                        "username": f"user{i}",
+                        "email": f"user{i}@example.com",
+                        "password_reset_token": f"token{i}" if i % 2 else None,
+                    }
+                    for i in range(1, USERS + 1)
+                ],
+            )
+            await conn.execute(
+                insert(Contact),
+                [
+                    {
+                        "firstname": f"First{i}",
+                        "lastname": f"Last{i % 97}",
+                        "email": f"contact{user_id}_{i}@example.com",
+                        "phone": "380671234567",
+                        "birthday": datetime(1980, 1, 1) + timedelta(days=i),
+                        "description": "Seeded contact",
+                        "done": i % 2 == 0,
+                        "updated_at": now - timedelta(minutes=i),
+                        "user_id": user_id,
+                    }
+                    for user_id in range(1, USERS + 1)
+                    for i in range(CONTACTS_PER_USER)
+                ],
+            )
+            await conn.execute(text("ANALYZE"))
+
+    asyncio.run(seed())
+    return engine
+
+
+async def explain(engine, stmt) -> list[str]:
+    compiled = stmt.compile(
+        dialect=engine.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = compiled.construct_params()
+    args = tuple(params[name] for name in compiled.positiontup)
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", args)
+        return [row[-1] for row in result]
+
+
+async def capture(engine, repository_class, call) -> list:
+    session = CaptureSession(engine)
+    await call(repository_class(session))
+    return session.statements
+
+
+def assert_no_scan(plan: list[str], allow_sort: bool = False):
+    scans = [
+        step
+        for step in plan
+        if re.match(r"SCAN (contacts|users)\b", step)
+        or (not allow_sort and step.startswith("USE TEMP B-TREE FOR ORDER BY"))
+    ]
+    assert not scans, plan
+
+
+contact_queries = {
+    "get_contacts": lambda r: r.get_contacts(0, 100, user),
+    "get_contacts_offset": lambda r: r.get_contacts(50, 100, user),
+    "get_contacts_lastname": lambda r: r.get_contacts(0, 100, user, order_by=ContactOrder.lastname),
+    "get_contacts_updated_at": lambda r: r.get_contacts(0, 100, user, order_by=ContactOrder.updated_at),
+    "get_contacts_cursor_id": lambda r: r.get_contacts(0, 100, user, after=(10, 10)),
+    "get_contacts_cursor_lastname": lambda r: r.get_contacts(
+        0, 100, user, after=("Last5", 10), order_by=ContactOrder.lastname
+    ),
+    "get_contacts_cursor_updated_at": lambda r: r.get_contacts(
+        0, 100, user, after=(datetime.now(), 10), order_by=ContactOrder.updated_at
+    ),
+    "get_contact_by_id": lambda r: r.get_contact_by_id(10, user),
+    "search_contacts": lambda r: r.search_contacts("lastname", "Last1", 0, 100, user),
+    "search_contacts_all": lambda r: r.search_contacts("all", "ast1", 0, 100, user),
+    "search_contacts_short": lambda r: r.search_contacts("email", "1", 0, 100, user),
+    "birthdays_contacts": lambda r: r.birthdays_contacts(0, 100, user),
+    "birthdays_contacts_new_year": lambda r: r.birthdays_contacts(
+        0, 100, user, days=30, today=date(2025, 12, 20)
+    ),
+    "birthdays_contacts_lastname": lambda r: r.birthdays_contacts(
+        0, 100, user, order_by=ContactOrder.lastname
+    ),
+    "get_suggest_items": lambda r: r.get_suggest_items(user),
+}
+
+# Birthday windows select a few days of contacts, sorting them is bounded
+sorted_in_memory = {
+    "birthdays_contacts",
+    "birthdays_contacts_new_year",
+    "birthdays_contacts_lastname",
+}
+
+user_queries = {
+    "get_user_by_id": lambda r: r.get_user_by_id(3),
+    "get_user_by_username": lambda r: r.get_user_by_username("user3"),
+    "get_user_by_email": lambda r: r.get_user_by_email("user3@example.com"),
+    "get_user_by_password_token": lambda r: r.get_user_by_password_token("token"),
+    "get_token_version": lambda r: r.get_token_version(3),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", contact_queries)
+async def test_contact_query_plans(engine, name):
+    for stmt in await capture(engine, ContactRepository, contact_queries[name]):
+        assert_no_scan(await explain(engine, stmt), allow_sort=name in sorted_in_memory)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", user_queries)
+async def test_user_query_plans(engine, name):
+    for stmt in await capture(engine, UserRepository, user_queries[name]):
+        assert_no_scan(await explain(engine, stmt))
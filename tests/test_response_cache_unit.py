@@ -0,0 +1,58 @@
+import fakeredis
+import pytest
+
+from src.schemas import ContactOrder
+from src.services.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    decode_response,
+    encode_response,
+    normalize_params,
+)
+
+
+def test_encode_decode_response():
+    entry = CachedResponse(b'[{"id":1}]', {"x-next-cursor": "abc"})
+    assert decode_response(encode_response(entry)) == entry
+    assert decode_response(None) is None
+    assert decode_response(b"corrupted") is None
+
+
+def test_normalize_params_ignores_order_and_missing():
+    assert normalize_params({"limit": 10, "order_by": ContactOrder.id, "cursor": None}) == (
+        normalize_params({"order_by": "id", "limit": 10})
+    )
+    assert normalize_params({"limit": 10}) != normalize_params({"limit": 20})
+
+
+@pytest.mark.asyncio
+async def test_response_cache_hits_misses_and_size_limit():
+    redis = fakeredis.FakeAsyncRedis()
+    cache = ResponseCache("test", ttl=60, max_bytes=64)
+    key = cache.key(1, "v1", "list", {"limit": 10})
+    assert key != cache.key(1, "v2", "list", {"limit": 10})
+    assert key != cache.key(2, "v1", "list", {"limit": 10})
+
+    assert await cache.get(redis, key) is None
+    entry = CachedResponse(b"[]", {})
+    await cache.set(redis, key, entry)
+    assert await cache.get(redis, key) == entry
+    assert 0 < await redis.ttl(key) <= 60
+
+    big = cache.key(1, "v1", "list", {"limit": 100})
+    await cache.set(redis, big, CachedResponse(b"x" * 100, {}))
+    assert await cache.get(redis, big) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["oversized"]) == (1, 2, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+@pytest.mark.asyncio
+async def test_response_cache_disabled_with_zero_ttl():
+    redis = fakeredis.FakeAsyncRedis()
+    cache = ResponseCache("test", ttl=0, max_bytes=1024)
+    key = cache.key(1, "v1", "list", {})
+    await cache.set(redis, key, CachedResponse(b"[]", {}))
+    assert await redis.get(key) is None
+    assert await cache.get(redis, key) is None
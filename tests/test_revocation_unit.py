@@ -0,0 +1,81 @@
+import asyncio
+
+import fakeredis
+import pytest
+import time
+
+from src.services.bloom import BloomFilter
+from src.services.revocation import RevocationList
+
+
+def test_bloom_filter_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives / 10000 < 0.03
+    assert bloom.stats()["memory_bytes"] == (bloom.size + 7) // 8
+
+
+@pytest.mark.asyncio
+async def test_revocation_list():
+    redis = fakeredis.FakeAsyncRedis()
+    revocation_list = RevocationList(capacity=100, error_rate=0.01)
+    await revocation_list.revoke(redis, "revoked", time.time() + 60)
+
+    assert await revocation_list.is_revoked(redis, "revoked")
+    assert not await revocation_list.is_revoked(redis, "active")
+
+    # Other worker picks up revocation on sync
+    other_worker = RevocationList(capacity=100, error_rate=0.01)
+    assert not await other_worker.is_revoked(redis, "revoked")
+    await other_worker.sync(redis)
+    assert await other_worker.is_revoked(redis, "revoked")
+    await other_worker.rebuild(redis)
+    assert await other_worker.is_revoked(redis, "revoked")
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_sync_reads_each_entry_once():
+    redis = fakeredis.FakeAsyncRedis()
+    writer = RevocationList(capacity=100, error_rate=0.01)
+    reader = RevocationList(capacity=100, error_rate=0.01)
+    await writer.revoke(redis, "first", time.time() + 60)
+    await reader.sync(redis)
+    first_id = reader.last_id
+    await writer.revoke(redis, "second", time.time() + 60)
+    await reader.sync(redis)
+    assert reader.last_id > first_id
+    assert await reader.is_revoked(redis, "first")
+    assert await reader.is_revoked(redis, "second")
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_rebuild_keeps_serving_current_filter():
+    redis = fakeredis.FakeAsyncRedis()
+    revocation_list = RevocationList(capacity=100, error_rate=0.01)
+    await revocation_list.revoke(redis, "revoked", time.time() + 60)
+
+    read_started = asyncio.Event()
+    release = asyncio.Event()
+    xread = redis.xread
+
+    async def slow_xread(*args, **kwargs):
+        read_started.set()
+        await release.wait()
+        return await xread(*args, **kwargs)
+
+    redis.xread = slow_xread
+    rebuild = asyncio.create_task(revocation_list.rebuild(redis))
+    await read_started.wait()
+    # Lookups and revocations during rebuild
+    assert await revocation_list.is_revoked(redis, "revoked")
+    await revocation_list.revoke(redis, "during", time.time() + 60)
+    release.set()
+    await rebuild
+
+    assert await revocation_list.is_revoked(redis, "revoked")
+    assert await revocation_list.is_revoked(redis, "during")
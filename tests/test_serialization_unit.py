@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from src.database.models import Contact
+from src.schemas import ContactResponse
+from src.services.serialization import contact_row, contacts_json
+
+contacts = [
+    Contact(
+        id=1,
+        firstname='Олена "q" \n\t\x01 😀',
+        lastname="Ш/\\",
+        email="olena@example.com",
+        phone="380671234567",
+        birthday=datetime(1990, 2, 28),
+        description="d\x7f",
+        done=False,
+        version=3,
+        created_at=datetime(2024, 1, 2, 3, 4, 5, 123456),
+        updated_at=None,
+    ),
+    Contact(
+        id=2,
+        firstname="A",
+        lastname="B",
+        email="b@example.com",
+        phone="380671234567",
+        birthday=datetime(2000, 12, 1),
+        description="",
+        done=True,
+        version=1,
+        created_at=datetime(2024, 1, 2, 3, 4, 5),
+        updated_at=datetime(2024, 5, 6, 7, 8, 9, 1),
+    ),
+    # Inserted outside the API, EmailStr normalizes the domain
+    Contact(
+        id=3,
+        firstname="C",
+        lastname="D",
+        email="Foo@EXAMPLE.COM",
+        phone="380671234567",
+        birthday=datetime(2001, 1, 1),
+        description="",
+        done=False,
+        version=1,
+        created_at=datetime(2024, 1, 2, 3, 4, 5),
+        updated_at=None,
+    ),
+    Contact(
+        id=4,
+        firstname="E",
+        lastname="F",
+        email=" ünï@Exämple.COM",
+        phone="380671234567",
+        birthday=datetime(2001, 1, 1),
+        description="",
+        done=False,
+        version=1,
+        created_at=datetime(2024, 1, 2, 3, 4, 5),
+        updated_at=None,
+    ),
+]
+
+
+def response_model_body(values) -> bytes:
+    # What FastAPI renders for response_model=List[ContactResponse]
+    field = create_model_field("Response", List[ContactResponse], mode="serialization")
+    value, errors = field.validate(values, {}, loc=("response",))
+    assert not errors
+    return JSONResponse(jsonable_encoder(field.serialize(value, by_alias=True))).body
+
+
+def test_contacts_json_matches_response_model():
+    assert contacts_json(contacts) == response_model_body(contacts)
+    assert contacts_json([]) == response_model_body([]) == b"[]"
+    assert b'"Foo@example.com"' in contacts_json(contacts)
+
+
+def test_contact_row_converts_birthday_to_date():
+    row = contact_row(contacts[0], ("id", "birthday"))
+    assert row == {"id": 1, "birthday": datetime(1990, 2, 28).date()}
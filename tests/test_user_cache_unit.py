@@ -0,0 +1,194 @@
+import asyncio
+import pickle
+import time
+
+import fakeredis
+import pytest
+
+from src.schemas import UserRole, UserSnapshot
+from src.services.cache import LRUCache, SingleFlight
+from src.services.user_cache import (
+    USER_CACHE_VERSION,
+    USER_INVALIDATION_CHANNEL,
+    CachedUser,
+    encode_user,
+    decode_user,
+    should_refresh,
+    cache_user,
+    get_cached_user,
+    get_user,
+    get_token_version,
+    invalidate_user,
+    invalidate_token_version,
+    listen_user_invalidations,
+    user_l1_cache,
+    token_version_cache,
+)
+
+
+def make_snapshot():
+    return UserSnapshot(
+        id=1,
+        username="testuser",
+        email="test@example.com",
+        role=UserRole.ADMIN,
+        avatar="http://some.url.com",
+        confirmed=True,
+    )
+
+
+def test_encode_decode_user():
+    entry = CachedUser(make_snapshot(), 1700000000.5, 0.01)
+    data = encode_user(entry)
+
+    assert data[0] == USER_CACHE_VERSION
+    assert decode_user(data) == entry
+
+
+def test_decode_user_unknown_version():
+    data = encode_user(CachedUser(make_snapshot(), 1700000000.5, 0.01))
+
+    assert decode_user(bytes((USER_CACHE_VERSION + 1,)) + data[1:]) is None
+
+
+def test_decode_user_legacy_pickle():
+    assert decode_user(pickle.dumps({"username": "testuser"})) is None
+
+
+def test_decode_user_empty_or_corrupted():
+    assert decode_user(None) is None
+    assert decode_user(b"") is None
+    assert decode_user(bytes((USER_CACHE_VERSION,)) + b"{not json") is None
+
+
+def test_lru_cache_eviction_and_stats():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidation():
+    redis = fakeredis.FakeAsyncRedis()
+    snapshot = make_snapshot()
+    await cache_user(redis, snapshot)
+    assert (await get_cached_user(redis, snapshot.username)).user == snapshot
+
+    listener = asyncio.create_task(listen_user_invalidations(redis))
+    await asyncio.sleep(0.1)
+    user_l1_cache.set(snapshot.username, CachedUser(snapshot, time.time() + 60, 0.0))
+    await redis.publish(USER_INVALIDATION_CHANNEL, f"u:{snapshot.username}")
+    await asyncio.sleep(0.1)
+    listener.cancel()
+
+    assert user_l1_cache.get(snapshot.username) is None
+
+    await invalidate_user(redis, snapshot.username)
+    assert await get_cached_user(redis, snapshot.username) is None
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_calls():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    results = await asyncio.gather(*(single_flight.do("key", load) for _ in range(10)))
+
+    assert calls == 1
+    assert results == [1] * 10
+    assert "key" not in single_flight
+
+
+@pytest.mark.asyncio
+async def test_get_user_single_db_load_on_miss():
+    redis = fakeredis.FakeAsyncRedis()
+    snapshot = make_snapshot()
+    await invalidate_user(redis, snapshot.username)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return snapshot
+
+    users = await asyncio.gather(
+        *(get_user(redis, snapshot.username, loader) for _ in range(10))
+    )
+
+    assert calls == 1
+    assert users == [snapshot] * 10
+    assert (await get_cached_user(redis, snapshot.username)).user == snapshot
+
+
+def test_should_refresh():
+    now = time.time()
+
+    assert should_refresh(CachedUser(make_snapshot(), now - 1, 0.0), now)
+    assert not should_refresh(CachedUser(make_snapshot(), now + 3600, 0.001), now)
+    assert should_refresh(CachedUser(make_snapshot(), now + 1, 1000.0), now)
+
+
+@pytest.mark.asyncio
+async def test_get_user_early_refresh_in_background():
+    redis = fakeredis.FakeAsyncRedis()
+    snapshot = make_snapshot()
+    user_l1_cache.set(snapshot.username, CachedUser(snapshot, time.time(), 1000.0))
+    refreshed = snapshot.model_copy(update={"avatar": "http://new.url.com"})
+
+    async def loader():
+        raise AssertionError("cache hit must not load synchronously")
+
+    async def background_loader():
+        return refreshed
+
+    user = await get_user(redis, snapshot.username, loader, background_loader)
+    await asyncio.sleep(0.05)
+
+    assert user == snapshot
+    assert (await get_cached_user(redis, snapshot.username)).user == refreshed
+
+
+@pytest.mark.asyncio
+async def test_get_token_version_cached():
+    redis = fakeredis.FakeAsyncRedis()
+    await invalidate_token_version(redis, 42)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return 3
+
+    assert await get_token_version(redis, 42, loader) == 3
+    token_version_cache.delete(42)
+    assert await get_token_version(redis, 42, loader) == 3
+    assert await get_token_version(redis, 42, loader) == 3
+    assert calls == 1
+
+    await invalidate_token_version(redis, 42)
+    assert await redis.get("token_version:42") is None
+    assert token_version_cache.get(42) is None